@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+import cubo
+
+# Agregações de cada gráfico e tabela do painel, todas calculadas sobre o cubo particionado
+# (particoes.Particoes de cubo.construir_cubo). Não dependem do Streamlit, então também
+# servem para benchmarks e exportações em lote.
+
+
+def crimes_por_ano(cubo_particionado):
+    crimes_anos = cubo.somar(cubo_particionado.visao(), 'ANO_BO')
+    crimes_anos['%'] = round((crimes_anos['QTD'] / crimes_anos['QTD'].sum()) * 100, 2)
+    return crimes_anos
+
+
+def contagem_por_mes(cubo_particionado, meses, n=5):
+    """Ocorrências por ano e mês nos meses escolhidos, com o texto de hover dos n maiores crimes."""
+    agrupados = cubo.somar(cubo_particionado.visao(), ['ANO_BO', 'MES_ESTATISTICA'], MES_ESTATISTICA=meses)
+    agrupados = agrupados.rename(columns={'QTD': 'count'})
+    hover_textos = cubo.textos_hover(cubo_particionado.visao(), ['ANO_BO', 'MES_ESTATISTICA'], 'NATUREZA_APURADA', n,
+                                     MES_ESTATISTICA=meses)
+    return agrupados.merge(hover_textos, on=['ANO_BO', 'MES_ESTATISTICA'], how='left')
+
+
+def ocorrencias_por_mes(cubo_particionado):
+    return cubo.somar(cubo_particionado.visao(), ['ANO_BO', 'MES_ESTATISTICA'])
+
+
+def calcular_porcentagem(ocorrencias):
+    total = ocorrencias['QTD'].sum()
+    ocorrencias['Porcentagem'] = (ocorrencias['QTD'] / total) * 100
+    return ocorrencias
+
+
+def regioes_do_ano(cubo_particionado, ano):
+    return calcular_porcentagem(cubo.somar(cubo_particionado.visao(ANO_BO=ano), 'regiao'))
+
+
+def ocorrencias_por_regiao(cubo_particionado):
+    # Ordenado do maior para o menor, para o gráfico de funil
+    ocorrencias = calcular_porcentagem(cubo.somar(cubo_particionado.visao(), 'regiao'))
+    return ocorrencias.sort_values('QTD', ascending=False)
+
+
+def top_crimes_por_regiao(cubo_particionado, ano, n=5):
+    """Os n crimes mais comuns de cada região no ano, com a porcentagem dentro do top da região."""
+    ocorrencias = cubo.somar(cubo_particionado.visao(ANO_BO=ano), ['regiao', 'NATUREZA_APURADA'])
+    top = ocorrencias.sort_values(['regiao', 'QTD'], ascending=[True, False]).groupby('regiao', observed=True).head(n)
+    total_por_regiao = top.groupby('regiao', observed=True)['QTD'].sum().reset_index()
+    top = top.merge(total_por_regiao, on='regiao', suffixes=('', '_total'))
+    top['Porcentagem'] = (top['QTD'] / top['QTD_total']) * 100
+    return top
+
+
+MEDIDAS = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max', 'variancia', 'moda']
+
+# Tabelas de estatísticas do painel: (recorte, dimensão dos grupos, coluna cujas frequências são descritas)
+RECORTES = [
+    ('crimes_por_ano', 'ANO_BO', 'NATUREZA_APURADA'),
+    ('regioes_por_ano', 'ANO_BO', 'regiao'),
+    ('crimes_por_regiao', 'regiao', 'NATUREZA_APURADA'),
+]
+
+
+def _com_ausentes(codigos, n):
+    # Código -1 (valor ausente) vai para a posição extra n
+    return np.where(codigos >= 0, codigos, n)
+
+
+def contagens_por_grupo(tabela):
+    """Contagens ano x região x natureza em um array denso, somadas com um único bincount.
+
+    Retorna o array e os rótulos de cada eixo (anos, regiões e naturezas na ordem das categorias).
+    Os eixos de região e natureza têm uma posição a mais no fim, para as células em branco (código -1).
+    """
+    anos, codigos_ano = np.unique(tabela['ANO_BO'].to_numpy(), return_inverse=True)
+    regioes = tabela['regiao'].cat.categories
+    naturezas = tabela['NATUREZA_APURADA'].cat.categories
+    codigos_regiao = _com_ausentes(tabela['regiao'].cat.codes.to_numpy(), len(regioes))
+    codigos_natureza = _com_ausentes(tabela['NATUREZA_APURADA'].cat.codes.to_numpy(), len(naturezas))
+    indice = (codigos_ano * (len(regioes) + 1) + codigos_regiao) * (len(naturezas) + 1) + codigos_natureza
+    forma = (len(anos), len(regioes) + 1, len(naturezas) + 1)
+    contagens = np.bincount(indice, weights=tabela['QTD'].to_numpy(), minlength=np.prod(forma)).reshape(forma)
+    return contagens, {'ANO_BO': anos.tolist(), 'regiao': list(regioes), 'NATUREZA_APURADA': list(naturezas)}
+
+
+def medidas_descritivas(matriz, grupos, categorias):
+    """Medidas de agregacoes.MEDIDAS das frequências de cada linha da matriz (grupos x categorias).
+
+    Equivale a describe/var/moda/idxmax/idxmin de value_counts por grupo, sem as categorias com
+    contagem zero, calculado para todos os grupos de uma vez. Empates na moda, no máximo e no mínimo
+    ficam com a primeira categoria, como nas frequências em ordem decrescente estável.
+    """
+    presentes = matriz > 0
+    com_dados = presentes.any(axis=1)
+    matriz, presentes = matriz[com_dados], presentes[com_dados]
+    grupos = [grupo for grupo, manter in zip(grupos, com_dados) if manter]
+
+    n = presentes.sum(axis=1)
+    mascarada = np.where(presentes, matriz, np.nan)
+    media = np.nansum(mascarada, axis=1) / n
+    desvios = np.where(presentes, matriz - media[:, None], 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Um único valor: 0/0 dá NaN, como a variância amostral do pandas
+        variancia = (desvios ** 2).sum(axis=1) / (n - 1)
+    minimo, q1, mediana, q3, maximo = np.nanquantile(mascarada, [0, 0.25, 0.5, 0.75, 1], axis=1)
+    categorias = np.asarray(categorias, dtype=object)
+    categoria_max = categorias[np.argmax(matriz, axis=1)]
+    categoria_min = categorias[np.nanargmin(mascarada, axis=1)]
+
+    valores = np.round(np.column_stack([n, media, np.sqrt(variancia), minimo, q1, mediana, q3, maximo, variancia]), 2)
+    valores = np.column_stack([valores.astype(object), categoria_max])
+    categoria = np.full(valores.shape, '', dtype=object)
+    categoria[:, MEDIDAS.index('min')] = categoria_min
+    categoria[:, MEDIDAS.index('max')] = categoria_max
+
+    return pd.DataFrame({
+        'grupo': np.repeat(np.asarray(grupos, dtype=object), len(MEDIDAS)),
+        'Medidas': MEDIDAS * len(grupos),
+        'Valores': valores.ravel(),
+        'Categoria': categoria.ravel(),
+    })
+
+
+def tabelas_estatisticas(cubo_particionado):
+    """Todas as tabelas de estatísticas do painel (cada recorte, cada grupo e 'Todos') em uma passada.
+
+    Formato longo: recorte, grupo, Medidas, Valores, Categoria; a interface só fatia com `tabela_do_recorte`.
+    """
+    contagens, rotulos = contagens_por_grupo(cubo_particionado.tabela)
+    eixos = {'ANO_BO': 0, 'regiao': 1, 'NATUREZA_APURADA': 2}
+    partes = []
+    for recorte, grupo, coluna in RECORTES:
+        # Soma o eixo que não participa do recorte e põe os grupos nas linhas
+        restante, = set(eixos.values()) - {eixos[grupo], eixos[coluna]}
+        matriz = contagens.sum(axis=restante)
+        if eixos[grupo] > eixos[coluna]:
+            matriz = matriz.T
+        # 'Todos' inclui as linhas com o grupo em branco; a posição das células em branco sai dos grupos e das categorias
+        matriz = np.vstack([matriz[:len(rotulos[grupo])], matriz.sum(axis=0)])[:, :len(rotulos[coluna])]
+        tabela = medidas_descritivas(matriz, rotulos[grupo] + ['Todos'], rotulos[coluna])
+        tabela.insert(0, 'recorte', recorte)
+        partes.append(tabela)
+    return pd.concat(partes, ignore_index=True)
+
+
+def tabela_do_recorte(tabelas, recorte, grupo):
+    """Tabela Medidas/Valores/Categoria de um recorte e grupo (ex.: 'crimes_por_ano', 2023)."""
+    selecao = (tabelas['recorte'] == recorte) & (tabelas['grupo'] == grupo)
+    return tabelas.loc[selecao, ['Medidas', 'Valores', 'Categoria']].reset_index(drop=True)
@@ -0,0 +1,60 @@
+"""Compara a ingestão de vários arquivos com 1, 2, 4 e N processos.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.ingestao_paralela --arquivos 12 --linhas 500000
+    python -m benchmarks.ingestao_paralela --padrao "exportacoes/*.csv"
+
+Os snapshots Parquet e os cubos dos arquivos são apagados antes de cada rodada, para medir o parse dos CSVs.
+"""
+import argparse
+import glob
+import os
+import tempfile
+import time
+
+import dados
+from benchmarks import sintetico
+
+
+def remover_snapshots(padrao):
+    # Sem snapshots nem cubos, cada rodada mede o parse completo dos CSVs
+    for caminho in glob.glob(padrao):
+        for derivado in (dados.caminho_snapshot(caminho), dados.caminho_cubo(caminho)):
+            if os.path.exists(derivado):
+                os.remove(derivado)
+
+
+def medir(padrao, processos, tamanho_bloco):
+    remover_snapshots(padrao)
+    inicio = time.perf_counter()
+    dados.carregar_arquivos(padrao, processos, tamanho_bloco)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--padrao", help="padrão dos CSVs; sem ele, arquivos sintéticos são gerados")
+    parser.add_argument("--arquivos", type=int, default=12, help="arquivos sintéticos (um por mês)")
+    parser.add_argument("--linhas", type=int, default=500_000, help="linhas por arquivo sintético")
+    parser.add_argument("--bloco", type=int, help="cada processo lê seu arquivo em blocos e devolve só o cubo")
+    argumentos = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        padrao = argumentos.padrao
+        if padrao is None:
+            for indice in range(argumentos.arquivos):
+                sintetico.gravar_csv(os.path.join(diretorio, f"ssp_{indice:02d}.csv"), argumentos.linhas, semente=indice)
+            padrao = os.path.join(diretorio, "*.csv")
+
+        nucleos = os.cpu_count() or 1
+        contagens = sorted({1, 2, 4, nucleos})
+        base = None
+        print(f"{'processos':>9}  {'tempo (s)':>9}  {'aceleração':>10}")
+        for processos in contagens:
+            tempo = medir(padrao, processos, argumentos.bloco)
+            base = base or tempo
+            print(f"{processos:>9}  {tempo:>9.2f}  {base / tempo:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Benchmark das etapas de dados do painel, sem a interface do Streamlit.
+
+Gera CSVs sintéticos com o esquema de DadosCriminais.csv e mede, para cada etapa (carga,
+filtro de 2021, correções, cada agregação de gráfico e cada tabela de estatísticas), o
+tempo, o pico de memória alocada e as linhas por segundo.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.pipeline --linhas 1000000 10000000 50000000 --salvar base.json
+    python -m benchmarks.pipeline --linhas 1000000 --comparar base.json
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import agregacoes
+import cubo
+import dados
+import particoes
+from benchmarks import sintetico
+
+# Uma etapa é considerada regressão quando fica mais lenta que a base além desta tolerância
+TOLERANCIA = 0.20
+
+
+def medir(resultados, nome, linhas, funcao, *args):
+    """Executa uma etapa medindo tempo, pico de memória e linhas por segundo.
+
+    `pico_mb` é o pico alocado pelo Python/NumPy durante a etapa (tracemalloc); `rss_max_mb`
+    é o maior RSS do processo até o fim da etapa, que inclui também a memória do Arrow.
+    """
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    tempo = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    resultados[nome] = {
+        "tempo_s": tempo,
+        "pico_mb": pico / 1e6,
+        # ru_maxrss é dado em KiB no Linux
+        "rss_max_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "linhas": linhas,
+        "linhas_por_s": linhas / tempo if tempo else None,
+    }
+    return resultado
+
+
+def filtrar_ano(df):
+    return df[df['ANO_BO'] != dados.ANO_EXCLUIDO]
+
+
+def corrigir(df):
+    df = df.copy()
+    df['NOME_DEPARTAMENTO'] = dados.corrigir_categorias(df['NOME_DEPARTAMENTO'], dados.CORRECAO_DPTO)
+    df['NATUREZA_APURADA'] = dados.corrigir_categorias(df['NATUREZA_APURADA'], dados.CORRECAO_CRIMES)
+    return df
+
+
+def executar(caminho_csv, linhas):
+    resultados = {}
+    caminho_parquet = dados.caminho_snapshot(caminho_csv)
+    if os.path.exists(caminho_parquet):
+        os.remove(caminho_parquet)
+
+    # Carga: CSV puro, geração do snapshot e leitura pelo snapshot
+    medir(resultados, "carga_csv", linhas, dados.ler_csv, caminho_csv)
+    medir(resultados, "carga_gerar_snapshot", linhas, dados.carregar_dados, caminho_csv)
+    df, _ = medir(resultados, "carga_snapshot", linhas, dados.carregar_dados, caminho_csv)
+
+    df = medir(resultados, "filtro_2021", len(df), filtrar_ano, df)
+    df = medir(resultados, "correcoes", len(df), corrigir, df)
+    contagens = medir(resultados, "cubo", len(df), cubo.construir_cubo, df)
+    cubo_particionado = medir(resultados, "particionamento", len(contagens), particoes.Particoes, contagens)
+    del df
+
+    # Agregações de cada gráfico e tabelas de estatísticas, todas sobre o cubo
+    celulas = len(cubo_particionado)
+    medir(resultados, "fig1_crimes_por_ano", celulas, agregacoes.crimes_por_ano, cubo_particionado)
+    medir(resultados, "fig2_contagem_por_mes", celulas, agregacoes.contagem_por_mes, cubo_particionado, list(range(1, 13)))
+    medir(resultados, "fig3_ocorrencias_por_mes", celulas, agregacoes.ocorrencias_por_mes, cubo_particionado)
+    medir(resultados, "fig4_regioes_do_ano", celulas, agregacoes.regioes_do_ano, cubo_particionado, 2023)
+    medir(resultados, "fig5_ocorrencias_por_regiao", celulas, agregacoes.ocorrencias_por_regiao, cubo_particionado)
+    medir(resultados, "fig6_top_crimes_por_regiao", celulas, agregacoes.top_crimes_por_regiao, cubo_particionado, 'Todos')
+    tabelas = medir(resultados, "tabelas_estatisticas", celulas, agregacoes.tabelas_estatisticas, cubo_particionado)
+    medir(resultados, "tabela_crimes_por_ano", len(tabelas), agregacoes.tabela_do_recorte, tabelas, 'crimes_por_ano', 2023)
+    medir(resultados, "tabela_regioes_por_ano", len(tabelas), agregacoes.tabela_do_recorte, tabelas, 'regioes_por_ano', 2023)
+    medir(resultados, "tabela_crimes_por_regiao", len(tabelas), agregacoes.tabela_do_recorte, tabelas, 'crimes_por_regiao', 'zona_Sul')
+    return resultados
+
+
+def comparar(atual, base):
+    """Imprime a razão atual/base de cada etapa e retorna as etapas que regrediram."""
+    regressoes = []
+    for tamanho, etapas in atual.items():
+        for etapa, medida in etapas.items():
+            referencia = base.get(tamanho, {}).get(etapa)
+            if referencia is None or not referencia["tempo_s"]:
+                continue
+            razao = medida["tempo_s"] / referencia["tempo_s"]
+            marca = "  REGRESSÃO" if razao > 1 + TOLERANCIA else ""
+            print(f"{tamanho:>12} {etapa:<30} {razao:6.2f}x{marca}")
+            if marca:
+                regressoes.append((tamanho, etapa))
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[1_000_000], help="tamanhos dos conjuntos sintéticos")
+    parser.add_argument("--salvar", help="grava os resultados em JSON como nova base")
+    parser.add_argument("--comparar", help="compara com uma base JSON; sai com código 1 se houver regressão")
+    argumentos = parser.parse_args()
+
+    todos = {}
+    with tempfile.TemporaryDirectory() as diretorio:
+        for linhas in argumentos.linhas:
+            caminho_csv = sintetico.gravar_csv(os.path.join(diretorio, f"sintetico_{linhas}.csv"), linhas)
+            resultados = executar(caminho_csv, linhas)
+            os.remove(caminho_csv)
+            todos[str(linhas)] = resultados
+
+            print(f"\n{linhas:,} linhas")
+            print(f"{'etapa':<30} {'tempo (s)':>10} {'pico (MB)':>10} {'RSS máx (MB)':>12} {'linhas/s':>14}")
+            for etapa, medida in resultados.items():
+                print(f"{etapa:<30} {medida['tempo_s']:>10.4f} {medida['pico_mb']:>10.1f} "
+                      f"{medida['rss_max_mb']:>12.0f} {medida['linhas_por_s'] or 0:>14,.0f}")
+
+    if argumentos.salvar:
+        with open(argumentos.salvar, "w") as arquivo:
+            json.dump(todos, arquivo, indent=2)
+    if argumentos.comparar:
+        with open(argumentos.comparar) as arquivo:
+            base = json.load(arquivo)
+        print()
+        if comparar(todos, base):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Teste de carga: memória do processo do painel conforme o número de sessões cresce.
+
+Cada sessão é um AppTest do streamlit_app.py no mesmo processo, como as abas de vários analistas
+num mesmo servidor; todas ficam vivas até o fim e cada uma muda os seletores de ano. Com o conjunto
+de dados compartilhado (st.cache_resource) a memória deve ficar estável depois da primeira sessão.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.sessoes --sessoes 30 --linhas 1000000
+    python -m benchmarks.sessoes --sessoes 30 --csv DadosCriminais.csv
+"""
+import argparse
+import gc
+import os
+import resource
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks import sintetico
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit_app.py")
+ANOS = [2022, 2023, 2024, 'Todos']
+
+
+def rss_atual_mb():
+    # /proc dá o RSS atual no Linux; nos outros sistemas fica o máximo (ru_maxrss em bytes no macOS)
+    try:
+        with open("/proc/self/statm") as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e6
+
+
+def abrir_sessao(indice):
+    sessao = AppTest.from_file(SCRIPT, default_timeout=600)
+    sessao.run()
+    if sessao.exception:
+        raise RuntimeError(sessao.exception[0].message)
+    # Cada sessão escolhe outro ano no primeiro seletor, como analistas diferentes
+    sessao.selectbox[0].set_value(ANOS[indice % len(ANOS)]).run()
+    return sessao
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessoes", type=int, default=30)
+    parser.add_argument("--linhas", type=int, default=1_000_000, help="linhas do CSV sintético")
+    parser.add_argument("--csv", help="CSV real; sem ele, um CSV sintético é gerado")
+    argumentos = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_csv = argumentos.csv or sintetico.gravar_csv(os.path.join(diretorio, "sintetico.csv"), argumentos.linhas)
+        os.environ["DADOS_CRIMINAIS_CSV"] = caminho_csv
+
+        inicial = rss_atual_mb()
+        sessoes = []
+        print(f"{'sessões':>7}  {'RSS (MB)':>9}  {'acréscimo (MB)':>14}  {'tempo (s)':>9}")
+        for indice in range(argumentos.sessoes):
+            inicio = time.perf_counter()
+            sessoes.append(abrir_sessao(indice))
+            tempo = time.perf_counter() - inicio
+            gc.collect()
+            rss = rss_atual_mb()
+            print(f"{len(sessoes):>7}  {rss:>9.0f}  {rss - inicial:>14.0f}  {tempo:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+import dados
+
+# Rótulos no formato das exportações da SSP (antes das correções)
+NATUREZAS = list(dados.CORRECAO_CRIMES) + ['homicidio doloso', 'estupro', 'latrocinio']
+PESOS_NATUREZAS = [0.40, 0.22, 0.10, 0.08, 0.06, 0.05, 0.04, 0.03, 0.01, 0.01]
+DEPARTAMENTOS = list(dados.CORRECAO_DPTO)
+REGIOES = ['zona_Central', 'zona_Leste', 'zona_Norte', 'zona_Oeste', 'zona_Sul']
+ANOS = [2021, 2022, 2023, 2024]
+
+
+def gerar_dados(linhas, semente=0, anos=ANOS):
+    """DataFrame sintético com o esquema de DadosCriminais.csv e algumas colunas extras não usadas."""
+    gerador = np.random.default_rng(semente)
+    return pd.DataFrame({
+        'NUM_BO': np.arange(linhas),
+        'ANO_BO': gerador.choice(anos, linhas),
+        'MES_ESTATISTICA': gerador.integers(1, 13, linhas),
+        'NATUREZA_APURADA': gerador.choice(NATUREZAS, linhas, p=PESOS_NATUREZAS),
+        'NOME_DEPARTAMENTO': gerador.choice(DEPARTAMENTOS, linhas),
+        'NOME_DELEGACIA': gerador.choice([f'{numero:03d} dp' for numero in range(1, 104)], linhas),
+        'regiao': gerador.choice(REGIOES, linhas),
+        'LOGRADOURO': 'rua sem nome',
+    })
+
+
+def gravar_csv(caminho, linhas, semente=0, anos=ANOS, tamanho_bloco=1_000_000):
+    # Gera em blocos para não precisar do arquivo inteiro em memória
+    for indice, inicio in enumerate(range(0, linhas, tamanho_bloco)):
+        bloco = gerar_dados(min(tamanho_bloco, linhas - inicio), semente + indice, anos)
+        bloco.to_csv(caminho, sep=';', index=False, mode='w' if indice == 0 else 'a', header=indice == 0)
+    return caminho
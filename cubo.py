@@ -0,0 +1,72 @@
+import pandas as pd
+
+from particoes import ignorar_filtro
+
+# Dimensões do cubo de contagens; todos os gráficos e tabelas são somas sobre elas
+DIMENSOES = ['ANO_BO', 'MES_ESTATISTICA', 'regiao', 'NATUREZA_APURADA']
+# Versão do formato do cubo, gravada com ele: cubos de versões anteriores são recalculados
+VERSAO = 2
+
+
+def construir_cubo(df):
+    """Conta as ocorrências por ano, mês, região e natureza em uma única passada.
+
+    Região ou natureza em branco formam células próprias (NaN): as linhas continuam nos totais
+    por ano e por mês, e só somem dos agrupamentos pela própria coluna, como em value_counts.
+    """
+    return df.groupby(DIMENSOES, observed=True, dropna=False).size().reset_index(name='QTD')
+
+
+def filtrar(cubo, **filtros):
+    # Filtros com valor None (ou 'Todos') são ignorados; listas viram isin.
+    # Filtros por ano e região devem vir antes, pela visão de particoes.Particoes
+    mascara = pd.Series(True, index=cubo.index)
+    for coluna, valor in filtros.items():
+        if ignorar_filtro(valor):
+            continue
+        if isinstance(valor, (list, tuple, set)):
+            mascara &= cubo[coluna].isin(list(valor))
+        else:
+            mascara &= cubo[coluna] == valor
+    return cubo[mascara]
+
+
+def somar(cubo, por, **filtros):
+    """Soma as contagens do cubo agrupando por uma ou mais dimensões, após os filtros."""
+    return filtrar(cubo, **filtros).groupby(por, observed=True)['QTD'].sum().reset_index()
+
+
+def frequencias(cubo, coluna, **filtros):
+    """Equivalente a value_counts() da coluna nas linhas filtradas, calculado pelo cubo."""
+    contagens = somar(cubo, coluna, **filtros).set_index(coluna)['QTD']
+    contagens = contagens[contagens > 0]
+    # Ordenação estável: empates ficam na ordem das categorias
+    return contagens.sort_values(ascending=False, kind='stable')
+
+
+def top_por_grupo(cubo, grupos, coluna, n=5, **filtros):
+    """Os n valores mais frequentes de `coluna` dentro de cada grupo, em uma única ordenação."""
+    contagens = somar(cubo, grupos + [coluna], **filtros)
+    contagens = contagens[contagens['QTD'] > 0]
+    contagens = contagens.sort_values(grupos + ['QTD'], ascending=[True] * len(grupos) + [False], kind='stable')
+    return contagens.groupby(grupos, observed=True).head(n)
+
+
+def textos_hover(cubo, grupos, coluna, n=5, **filtros):
+    """Monta o texto de hover com os n maiores de `coluna` para todos os grupos de uma vez."""
+    top = top_por_grupo(cubo, grupos, coluna, n, **filtros)
+    linhas = top[coluna].astype(str) + ': ' + top['QTD'].astype(str)
+    textos = linhas.groupby([top[grupo] for grupo in grupos], observed=True, sort=False).agg('<br>'.join)
+    return textos.rename('hover_text').reset_index()
+
+
+def combinar_cubos(cubos):
+    """Soma cubos parciais (de blocos ou arquivos diferentes) em um único cubo.
+
+    Cada parcial pode ter categorias diferentes, então as dimensões categóricas são
+    comparadas pelos rótulos (as células em branco continuam NaN) e recategorizadas no final.
+    """
+    categoricas = [coluna for coluna in DIMENSOES if isinstance(cubos[0][coluna].dtype, pd.CategoricalDtype)]
+    juntos = pd.concat([parcial.astype({coluna: object for coluna in categoricas}) for parcial in cubos], ignore_index=True)
+    combinado = juntos.groupby(DIMENSOES, dropna=False)['QTD'].sum().reset_index()
+    return combinado.astype({coluna: 'category' for coluna in categoricas})
@@ -0,0 +1,525 @@
+import contextlib
+import functools
+import glob
+import hashlib
+import json
+import os
+import time
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import cubo
+import importacao
+import paralelo
+import particoes
+
+CAMINHO_CSV = "DadosCriminais.csv"
+
+# Chave usada para guardar a origem do snapshot nos metadados do arquivo Parquet
+CHAVE_METADADOS = b"dados_criminais"
+
+# Colunas usadas pelo painel e seus tipos compactos; as demais colunas do CSV não são lidas
+ESQUEMA = {
+    "ANO_BO": "int16",
+    "MES_ESTATISTICA": "int8",
+    "NATUREZA_APURADA": "category",
+    "NOME_DEPARTAMENTO": "category",
+    "regiao": "category",
+}
+
+# Correções nos nomes dos departamentos e crimes
+CORRECAO_DPTO = {
+    'dipol - depto de inteligencia': 'Dipol ',
+    "deinter 2 - campinas": "Deiter 2 ",
+    "dope-depto op pol estrat.": "Dope ",
+    "demacro": "Demacro ",
+    "decap": "Decap "
+}
+
+CORRECAO_CRIMES = {
+    'furto - outros': 'Furto',
+    "roubo - outros": "Roubo",
+    "lesao corporal dolosa": "Lesao corporal dolosa",
+    "furto de veiculo": "Furto de veiculo",
+    "roubo de veiculo": "Roubo de veiculo",
+    "lesao corporal culposa por acidade de transito": "Lesao corporal culposa por acidade de transito",
+    "trafico de entorpecentes": "Trafico de entorpecentes"
+}
+
+# Versão da normalização dos rótulos (acentos, maiúsculas e espaços); faz parte da limpeza gravada com o cubo
+VERSAO_NORMALIZACAO = 2
+
+# Ano descartado da análise
+ANO_EXCLUIDO = 2021
+
+# Linhas por bloco na ingestão em blocos (CSVs maiores que a memória)
+TAMANHO_BLOCO = 1_000_000
+
+
+def caminho_snapshot(caminho_csv=CAMINHO_CSV):
+    # O snapshot fica ao lado do CSV, com o mesmo nome e extensão .parquet
+    return os.path.splitext(caminho_csv)[0] + ".parquet"
+
+
+def caminho_cubo(caminho_csv=CAMINHO_CSV):
+    # O cubo de contagens já limpo fica ao lado do snapshot
+    return os.path.splitext(caminho_csv)[0] + ".cubo.parquet"
+
+
+def assinatura_csv(caminho_csv=CAMINHO_CSV, prefixo=None):
+    """Retorna hash, mtime e tamanho do CSV para saber se o snapshot ainda é válido.
+
+    Com `prefixo` (em bytes), devolve também o hash dos primeiros `prefixo` bytes,
+    calculado na mesma leitura, para reconhecer um CSV que só recebeu linhas no final.
+    """
+    sha256 = hashlib.sha256()
+    sha256_prefixo = None
+    lidos = 0
+    ultimo = b""
+    with open(caminho_csv, "rb") as arquivo:
+        while bloco := arquivo.read(1 << 20):
+            if prefixo is not None and lidos < prefixo <= lidos + len(bloco):
+                corte = prefixo - lidos
+                sha256.update(bloco[:corte])
+                sha256_prefixo = sha256.hexdigest()
+                sha256.update(bloco[corte:])
+            else:
+                sha256.update(bloco)
+            lidos += len(bloco)
+            ultimo = bloco[-1:]
+    info = os.stat(caminho_csv)
+    return {
+        "sha256": sha256.hexdigest(),
+        "sha256_prefixo": sha256_prefixo,
+        "mtime": info.st_mtime,
+        "tamanho": info.st_size,
+        # Linhas só podem ser anexadas com segurança depois de uma quebra de linha
+        "termina_em_linha": ultimo == b"\n",
+    }
+
+
+def marca_arquivos(caminho):
+    """Mtime e tamanho dos arquivos (ou do padrão); chave barata para invalidar caches quando mudam."""
+    caminhos = sorted(glob.glob(caminho)) if eh_padrao(caminho) else [caminho]
+    return tuple((arquivo, os.stat(arquivo).st_mtime, os.stat(arquivo).st_size) for arquivo in caminhos)
+
+
+def colunas_csv(caminho_csv=CAMINHO_CSV):
+    return pd.read_csv(caminho_csv, sep=";", nrows=0).columns
+
+
+def verificar_colunas(caminho_csv=CAMINHO_CSV):
+    """Falha logo na partida se o CSV não tiver alguma coluna usada pelo painel."""
+    colunas = colunas_csv(caminho_csv)
+    faltando = [coluna for coluna in ESQUEMA if coluna not in colunas]
+    if faltando:
+        raise ValueError(f"Colunas ausentes em {caminho_csv}: {', '.join(faltando)}")
+
+
+def ler_csv(origem=CAMINHO_CSV, tamanho_bloco=None, colunas=None):
+    # Lê apenas as colunas do esquema, já com os tipos compactos. Com `colunas`, a origem é um
+    # arquivo já posicionado depois do cabeçalho (leitura só das linhas anexadas)
+    cabecalho = {"header": None, "names": colunas} if colunas is not None else {}
+    return pd.read_csv(origem, sep=";", usecols=list(ESQUEMA), dtype=ESQUEMA, chunksize=tamanho_bloco, **cabecalho)
+
+
+def _ler_metadados(caminho_parquet):
+    if not os.path.exists(caminho_parquet):
+        return None
+    metadados = pq.read_schema(caminho_parquet).metadata or {}
+    if CHAVE_METADADOS not in metadados:
+        return None
+    return json.loads(metadados[CHAVE_METADADOS])
+
+
+def _gravar_parquet(df, caminho_parquet, metadados_origem):
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    metadados = dict(tabela.schema.metadata or {})
+    metadados[CHAVE_METADADOS] = json.dumps(metadados_origem).encode()
+    tabela = tabela.replace_schema_metadata(metadados)
+
+    # Grava em um arquivo temporário e renomeia, para nunca deixar um arquivo pela metade
+    temporario = caminho_parquet + ".tmp"
+    pq.write_table(tabela, temporario, compression="zstd")
+    os.replace(temporario, caminho_parquet)
+
+
+def _mesmo_csv(metadados, assinatura):
+    # Qualquer mudança no hash ou no mtime do CSV, ou no esquema, invalida o snapshot
+    return (metadados is not None
+            and metadados["sha256"] == assinatura["sha256"]
+            and metadados["mtime"] == assinatura["mtime"]
+            and metadados.get("esquema") == ESQUEMA)
+
+
+def _csv_anexado(metadados, assinatura):
+    # O CSV só recebeu linhas no final: o início é idêntico ao que gerou o arquivo derivado
+    return (metadados is not None
+            and metadados.get("esquema") == ESQUEMA
+            and metadados.get("termina_em_linha", False)
+            and assinatura["tamanho"] > metadados["tamanho"]
+            and assinatura["sha256_prefixo"] == metadados["sha256"])
+
+
+def _ler_anexadas(caminho_csv, inicio, tamanho_bloco=None):
+    # Lê as linhas a partir do byte `inicio`, onde terminava a versão anterior do CSV
+    colunas = list(colunas_csv(caminho_csv))
+    arquivo = open(caminho_csv, "rb")
+    arquivo.seek(inicio)
+    if tamanho_bloco is not None:
+        return arquivo, ler_csv(arquivo, tamanho_bloco, colunas)
+    with arquivo:
+        return ler_csv(arquivo, colunas=colunas)
+
+
+def snapshot_valido(caminho_csv=CAMINHO_CSV, assinatura=None):
+    assinatura = assinatura or assinatura_csv(caminho_csv)
+    return _mesmo_csv(_ler_metadados(caminho_snapshot(caminho_csv)), assinatura)
+
+
+def gerar_snapshot(caminho_csv=CAMINHO_CSV, assinatura=None):
+    """Lê o CSV e grava um snapshot Parquet comprimido com a assinatura do CSV nos metadados."""
+    assinatura = assinatura or assinatura_csv(caminho_csv)
+
+    inicio = time.perf_counter()
+    df = ler_csv(caminho_csv)
+    tempo_csv = time.perf_counter() - inicio
+
+    _gravar_parquet(df, caminho_snapshot(caminho_csv), {**assinatura, "esquema": ESQUEMA, "tempo_csv": tempo_csv})
+    return df, tempo_csv
+
+
+def anexar_snapshot(caminho_csv, metadados, assinatura):
+    """Lê só as linhas anexadas ao CSV desde o snapshot, acrescenta-as a ele e soma suas contagens ao cubo."""
+    inicio = time.perf_counter()
+    novas = _ler_anexadas(caminho_csv, metadados["tamanho"])
+    tempo_csv = time.perf_counter() - inicio
+
+    df = concatenar_categoricas([pd.read_parquet(caminho_snapshot(caminho_csv)), novas])
+    _gravar_parquet(df, caminho_snapshot(caminho_csv),
+                    {**assinatura, "esquema": ESQUEMA, "tempo_csv": metadados.get("tempo_csv")})
+
+    # Os meses já contados não são recalculados: o cubo anterior só recebe as contagens das linhas novas
+    metadados_cubo = _ler_metadados(caminho_cubo(caminho_csv))
+    if metadados_cubo is not None and metadados_cubo["sha256"] == metadados["sha256"] and _mesma_limpeza(metadados_cubo):
+        anterior = pd.read_parquet(caminho_cubo(caminho_csv))
+        combinado = cubo.combinar_cubos([anterior, cubo.construir_cubo(limpar_dados(novas))])
+        _gravar_parquet(combinado, caminho_cubo(caminho_csv), _metadados_cubo(assinatura))
+    return df, len(novas), tempo_csv
+
+
+def carregar_dados(caminho_csv=CAMINHO_CSV, assinatura=None):
+    """Carrega os dados pelo snapshot Parquet, reconstruindo-o quando o CSV mudar.
+
+    Retorna o DataFrame e um relatório com tempos de carga e tamanhos dos dois caminhos.
+    `assinatura`, se dada, evita ler o CSV de novo para calcular o hash; ela deve trazer o hash
+    do prefixo do tamanho gravado no snapshot (veja `carregar_contagens`).
+    """
+    verificar_colunas(caminho_csv)
+    caminho_parquet = caminho_snapshot(caminho_csv)
+    metadados = _ler_metadados(caminho_parquet)
+    assinatura = assinatura or assinatura_csv(caminho_csv, metadados["tamanho"] if metadados else None)
+    relatorio = {
+        # Versão do conjunto de dados, usada como chave barata nos caches do painel
+        "versao": assinatura["sha256"][:16],
+        "csv_bytes": assinatura["tamanho"],
+        "reconstruido": False,
+    }
+
+    if _mesmo_csv(metadados, assinatura):
+        inicio = time.perf_counter()
+        df = pd.read_parquet(caminho_parquet)
+        relatorio["tempo_snapshot"] = time.perf_counter() - inicio
+        relatorio["tempo_csv"] = metadados.get("tempo_csv")
+    elif _csv_anexado(metadados, assinatura):
+        # Só as linhas novas são lidas do CSV; o restante vem do snapshot anterior
+        inicio = time.perf_counter()
+        df, relatorio["anexadas"], relatorio["tempo_csv_anexadas"] = anexar_snapshot(caminho_csv, metadados, assinatura)
+        relatorio["tempo_anexar"] = time.perf_counter() - inicio
+        relatorio["tempo_csv"] = metadados.get("tempo_csv")
+        relatorio["tempo_snapshot"] = None
+    else:
+        try:
+            df, relatorio["tempo_csv"] = gerar_snapshot(caminho_csv, assinatura)
+            relatorio["reconstruido"] = True
+        except OSError:
+            # Diretório somente leitura: segue com o CSV sem snapshot
+            inicio = time.perf_counter()
+            df = ler_csv(caminho_csv)
+            relatorio["tempo_csv"] = time.perf_counter() - inicio
+            relatorio["tempo_snapshot"] = None
+            relatorio["snapshot_bytes"] = None
+            return df, relatorio
+        # O tempo do snapshot só é medido a partir da próxima carga
+        relatorio["tempo_snapshot"] = None
+
+    relatorio["snapshot_bytes"] = os.path.getsize(caminho_parquet)
+    return df, relatorio
+
+
+@functools.lru_cache(maxsize=None)
+def normalizar_rotulo(rotulo):
+    """Forma canônica de um rótulo: sem acentos, casefold e com espaços internos simples, sem bordas."""
+    unidecode = importacao.importar('unidecode').unidecode
+    return " ".join(unidecode(rotulo).casefold().split())
+
+
+def _normalizar_correcoes(correcoes):
+    return {normalizar_rotulo(original): corrigido for original, corrigido in correcoes.items()}
+
+
+def corrigir_categorias(serie, correcoes):
+    """Aplica o mapa de correções sobre as categorias de uma coluna categórica.
+
+    Os rótulos são comparados na forma de `normalizar_rotulo`, então variações de acento,
+    maiúsculas e espaços também são corrigidas; rótulos fora do mapa ficam como estão, para que o
+    resultado não dependa de quais grafias aparecem em cada arquivo, bloco ou linhas anexadas.
+    Só os rótulos distintos são normalizados (com memoização); rótulos que passam a coincidir são
+    fundidos e os códigos das linhas são remapeados com uma única indexação.
+    """
+    categorias = serie.cat.categories
+    correcoes = _normalizar_correcoes(correcoes)
+    renomeadas = pd.Index([correcoes.get(normalizar_rotulo(categoria), categoria) for categoria in categorias])
+    novos_codigos, novas_categorias = pd.factorize(renomeadas, sort=True)
+
+    codigos = serie.cat.codes.to_numpy()
+    # Código -1 representa valor ausente e deve continuar assim: a posição extra -1 aponta para -1,
+    # o que também vale para uma coluna toda em branco (sem categorias)
+    codigos = np.append(novos_codigos, -1)[codigos]
+    corrigida = pd.Categorical.from_codes(codigos, categories=novas_categorias)
+    return pd.Series(corrigida, index=serie.index, name=serie.name)
+
+
+def _metadados_cubo(assinatura):
+    limpeza = {"dpto": CORRECAO_DPTO, "crimes": CORRECAO_CRIMES, "ano_excluido": ANO_EXCLUIDO,
+               "normalizacao": VERSAO_NORMALIZACAO}
+    return {**assinatura, "esquema": ESQUEMA, "limpeza": limpeza, "cubo": cubo.VERSAO}
+
+
+def _mesma_limpeza(metadados_cubo):
+    # Mudou um mapa de correções, o ano excluído ou o formato do cubo: as contagens gravadas não valem mais
+    return (metadados_cubo.get("limpeza") == _metadados_cubo({})["limpeza"] and metadados_cubo.get("esquema") == ESQUEMA
+            and metadados_cubo.get("cubo") == cubo.VERSAO)
+
+
+def _cubo_valido(metadados_cubo, assinatura):
+    return metadados_cubo is not None and metadados_cubo["sha256"] == assinatura["sha256"] and _mesma_limpeza(metadados_cubo)
+
+
+def carregar_cubo(caminho_csv, assinatura, df_limpo):
+    """Cubo de contagens gravado para a `assinatura` do CSV; se não houver, é calculado de `df_limpo` e gravado."""
+    if _cubo_valido(_ler_metadados(caminho_cubo(caminho_csv)), assinatura):
+        return pd.read_parquet(caminho_cubo(caminho_csv))
+
+    cubo_dados = cubo.construir_cubo(df_limpo)
+    try:
+        _gravar_parquet(cubo_dados, caminho_cubo(caminho_csv), _metadados_cubo(assinatura))
+    except OSError:
+        pass  # Diretório somente leitura: o cubo é recalculado na próxima carga
+    return cubo_dados
+
+
+def carregar_contagens(caminho_csv=CAMINHO_CSV, secao=None):
+    """Cubo de contagens de um CSV e o relatório da carga, lendo as linhas só quando preciso.
+
+    O CSV é lido uma única vez para o hash. Se o cubo gravado ao lado dele ainda vale para esse
+    hash e para a limpeza atual, só o cubo (alguns milhares de linhas) é lido; senão as linhas vêm
+    do snapshot (ou do CSV), são limpas e contadas, e o cubo é gravado para a próxima carga.
+    `secao(nome)`, se dado, mede as correções (ex.: Perfil.secao).
+    """
+    secao = secao or (lambda nome: contextlib.nullcontext())
+    verificar_colunas(caminho_csv)
+    metadados = _ler_metadados(caminho_snapshot(caminho_csv))
+    metadados_cubo = _ler_metadados(caminho_cubo(caminho_csv))
+    # O hash do prefixo reconhece linhas anexadas desde o snapshot (ou, sem ele, desde o cubo)
+    anterior = metadados or metadados_cubo
+    assinatura = assinatura_csv(caminho_csv, anterior["tamanho"] if anterior else None)
+
+    if _cubo_valido(metadados_cubo, assinatura):
+        inicio = time.perf_counter()
+        cubo_dados = pd.read_parquet(caminho_cubo(caminho_csv))
+        relatorio = {
+            "versao": assinatura["sha256"][:16],
+            "csv_bytes": assinatura["tamanho"],
+            "reconstruido": False,
+            "tempo_csv": metadados.get("tempo_csv") if metadados else None,
+            "tempo_snapshot": None,
+            "snapshot_bytes": os.path.getsize(caminho_snapshot(caminho_csv)) if metadados else None,
+            "tempo_cubo": time.perf_counter() - inicio,
+        }
+        return cubo_dados, relatorio
+
+    # Lê o snapshot Parquet ao lado do CSV; ele é reconstruído quando o CSV muda
+    linhas, relatorio = carregar_dados(caminho_csv, assinatura)
+    # Remove 2021 e corrige os nomes dos departamentos e crimes renomeando as categorias
+    with secao('correções'):
+        linhas = limpar_dados(linhas)
+    # Com linhas anexadas, anexar_snapshot já somou as contagens delas ao cubo gravado
+    return carregar_cubo(caminho_csv, assinatura, linhas), relatorio
+
+
+def limpar_dados(df):
+    """Remove o ano excluído e aplica as correções de departamentos e crimes."""
+    df = df[df['ANO_BO'] != ANO_EXCLUIDO].copy()
+    df['NOME_DEPARTAMENTO'] = corrigir_categorias(df['NOME_DEPARTAMENTO'], CORRECAO_DPTO)
+    df['NATUREZA_APURADA'] = corrigir_categorias(df['NATUREZA_APURADA'], CORRECAO_CRIMES)
+    return df
+
+
+def ingerir_em_blocos(caminho_csv=CAMINHO_CSV, tamanho_bloco=TAMANHO_BLOCO, progresso=None):
+    """Lê o CSV em blocos e atualiza o cubo de contagens a cada bloco, com memória limitada.
+
+    Cada bloco passa pelo filtro de 2021 e pelas correções antes de ser contado; só o
+    cubo acumulado (alguns milhares de linhas) fica em memória entre os blocos.
+    `progresso`, se informado, é chamado com (fração lida, linhas, linhas por segundo).
+    """
+    verificar_colunas(caminho_csv)
+    metadados = _ler_metadados(caminho_cubo(caminho_csv))
+    if metadados is not None and not _mesma_limpeza(metadados):
+        metadados = None
+    assinatura = assinatura_csv(caminho_csv, metadados["tamanho"] if metadados else None)
+    acumulado = None
+    linhas = 0
+
+    inicio = time.perf_counter()
+    if metadados is not None and metadados["sha256"] == assinatura["sha256"]:
+        # CSV já contado por inteiro
+        arquivo, leitor = None, []
+        acumulado = pd.read_parquet(caminho_cubo(caminho_csv))
+    elif _csv_anexado(metadados, assinatura):
+        # Só as linhas anexadas desde a última ingestão são lidas e somadas ao cubo gravado
+        arquivo, leitor = _ler_anexadas(caminho_csv, metadados["tamanho"], tamanho_bloco)
+        acumulado = pd.read_parquet(caminho_cubo(caminho_csv))
+    else:
+        arquivo = open(caminho_csv, "rb")
+        leitor = ler_csv(arquivo, tamanho_bloco)
+
+    try:
+        for bloco in leitor:
+            linhas += len(bloco)
+            parcial = cubo.construir_cubo(limpar_dados(bloco))
+            acumulado = parcial if acumulado is None else cubo.combinar_cubos([acumulado, parcial])
+            if progresso is not None:
+                decorrido = time.perf_counter() - inicio
+                progresso(arquivo.tell() / assinatura["tamanho"], linhas, linhas / decorrido)
+    finally:
+        if arquivo is not None:
+            arquivo.close()
+    tempo = time.perf_counter() - inicio
+
+    if linhas:
+        try:
+            _gravar_parquet(acumulado, caminho_cubo(caminho_csv), _metadados_cubo(assinatura))
+        except OSError:
+            pass  # Diretório somente leitura: a próxima ingestão lê o CSV inteiro de novo
+
+    relatorio = {
+        "versao": assinatura["sha256"][:16],
+        "csv_bytes": assinatura["tamanho"],
+        "reconstruido": False,
+        "tempo_csv": tempo,
+        "tempo_snapshot": None,
+        "snapshot_bytes": None,
+        "linhas": linhas,
+        "linhas_por_segundo": linhas / tempo if tempo else None,
+    }
+    return acumulado, relatorio
+
+
+def eh_padrao(caminho):
+    # Caminhos com curingas (*, ?, [) são tratados como um conjunto de arquivos
+    return any(caractere in caminho for caractere in "*?[")
+
+
+def concatenar_categoricas(frames):
+    """Concatena DataFrames mantendo as colunas categóricas, com a união das categorias."""
+    resultado = pd.concat(frames, ignore_index=True)
+    for coluna in frames[0].columns:
+        if isinstance(frames[0][coluna].dtype, pd.CategoricalDtype):
+            resultado[coluna] = union_categoricals([frame[coluna] for frame in frames], sort_categories=True)
+    return resultado
+
+
+def _carregar_arquivo(caminho_csv, tamanho_bloco):
+    # Executado em um processo do pool: só o cubo de contagens do arquivo volta ao processo principal.
+    # Ele fica gravado ao lado do arquivo; com `tamanho_bloco`, o arquivo é lido em blocos, com memória limitada
+    if tamanho_bloco:
+        return ingerir_em_blocos(caminho_csv, tamanho_bloco)
+    return carregar_contagens(caminho_csv)
+
+
+def carregar_arquivos(padrao, processos=None, tamanho_bloco=None):
+    """Carrega todos os CSVs que casam com o padrão em paralelo, um arquivo por processo.
+
+    Cada processo devolve o cubo de contagens do seu arquivo (lido em blocos, com `tamanho_bloco`);
+    retorna a soma dos cubos e um relatório com os totais dos arquivos e o tempo de parede da ingestão.
+    """
+    caminhos = sorted(glob.glob(padrao))
+    if not caminhos:
+        raise FileNotFoundError(f"Nenhum arquivo encontrado para {padrao}")
+
+    inicio = time.perf_counter()
+    # O painel chama esta função de uma thread do servidor: os processos saem de um forkserver
+    resultados = paralelo.mapear(_carregar_arquivo, caminhos, repeat(tamanho_bloco, len(caminhos)), processos=processos)
+    partes = [parte for parte, _ in resultados]
+    relatorios = [relatorio for _, relatorio in resultados]
+    combinado = cubo.combinar_cubos(partes)
+    tempo = time.perf_counter() - inicio
+
+    versoes = "".join(relatorio["versao"] for relatorio in relatorios)
+    tamanhos_snapshot = [relatorio["snapshot_bytes"] for relatorio in relatorios]
+    relatorio = {
+        "versao": hashlib.sha256(versoes.encode()).hexdigest()[:16],
+        "csv_bytes": sum(relatorio["csv_bytes"] for relatorio in relatorios),
+        "reconstruido": any(relatorio["reconstruido"] for relatorio in relatorios),
+        "tempo_csv": None,
+        "tempo_snapshot": None,
+        "snapshot_bytes": None if None in tamanhos_snapshot else sum(tamanhos_snapshot),
+        "arquivos": len(caminhos),
+        "tempo_total": tempo,
+    }
+    return combinado, relatorio
+
+
+def carregar_painel(caminho=CAMINHO_CSV, tamanho_bloco=None, processos=None, secao=None):
+    """Dados do painel a partir de um CSV ou de um padrão de arquivos: (cubo, relatório).
+
+    Todos os gráficos, tabelas e testes saem do cubo de contagens, particionado por ano e região
+    (particoes.Particoes); as linhas limpas só servem para montá-lo e não são mantidas. Com
+    `tamanho_bloco` as linhas nem chegam a ficar inteiras em memória. `secao(nome)`, se dado, mede
+    etapas internas (ex.: Perfil.secao).
+    """
+    if eh_padrao(caminho):
+        # Só os cubos de cada arquivo voltam dos processos, já somados
+        contagens, relatorio = carregar_arquivos(caminho, int(processos) if processos else None,
+                                                 int(tamanho_bloco) if tamanho_bloco else None)
+    elif tamanho_bloco:
+        contagens, relatorio = ingerir_em_blocos(caminho, int(tamanho_bloco))
+    else:
+        # O cubo fica gravado ao lado do snapshot e só recebe as contagens das linhas anexadas
+        contagens, relatorio = carregar_contagens(caminho, secao)
+    # Cubo de contagens (ano x mês x região x natureza) de onde saem todos os gráficos, particionado por ano e
+    # região: cada filtro vira uma fatia sem cópia
+    return particoes.Particoes(contagens), relatorio
+
+
+def _mostrar_progresso(fracao, linhas, linhas_por_segundo):
+    print(f"{fracao:6.1%}  {linhas:>12,} linhas  {linhas_por_segundo:>12,.0f} linhas/s", flush=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingestão em blocos do CSV de dados criminais.")
+    parser.add_argument("csv", nargs="?", default=CAMINHO_CSV)
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO, help="linhas por bloco")
+    argumentos = parser.parse_args()
+
+    cubo_final, relatorio_final = ingerir_em_blocos(argumentos.csv, argumentos.bloco, _mostrar_progresso)
+    print(f"{relatorio_final['linhas']:,} linhas em {relatorio_final['tempo_csv']:.2f} s; "
+          f"cubo com {len(cubo_final):,} linhas")
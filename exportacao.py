@@ -0,0 +1,152 @@
+"""Exportação em lote das análises do painel, sem servidor do Streamlit.
+
+Carrega os dados como o painel (snapshot, ingestão em blocos ou vários arquivos), calcula as
+agregações de todos os anos e regiões e grava cada grupo de relatórios em Parquet/CSV, com as
+figuras em HTML estático. Os grupos rodam em paralelo, um por processo.
+
+Uso (a partir da raiz do repositório):
+    python exportacao.py DadosCriminais.csv --saida relatorios
+    python exportacao.py "exportacoes/*.csv" --saida relatorios --formatos parquet csv --processos 4
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import agregacoes
+import dados
+import graficos
+import particoes
+
+FORMATOS = ['parquet', 'csv']
+
+
+def _anos(cubo_particionado):
+    return sorted(cubo_particionado.deslocamentos_primeira)
+
+
+def _por_filtro(funcao, cubo_particionado, coluna, valores):
+    """Concatena o resultado de `funcao(cubo_particionado, valor)` para cada valor, identificado em `coluna`."""
+    partes = []
+    for valor in valores:
+        parte = funcao(cubo_particionado, valor)
+        parte.insert(0, coluna, str(valor))
+        partes.append(parte)
+    return pd.concat(partes, ignore_index=True)
+
+
+# Cada grupo devolve ({nome: tabela}, {nome: figura}) calculados sobre o cubo particionado
+
+def grupo_anos(cubo_particionado):
+    return ({'crimes_por_ano': agregacoes.crimes_por_ano(cubo_particionado)},
+            {'crimes_por_ano': graficos.crimes_por_ano(cubo_particionado)})
+
+
+def grupo_meses(cubo_particionado):
+    meses = list(range(1, 13))
+    return ({'contagem_por_mes': agregacoes.contagem_por_mes(cubo_particionado, meses),
+             'ocorrencias_por_mes': agregacoes.ocorrencias_por_mes(cubo_particionado)},
+            {'contagem_por_mes': graficos.contagem_por_mes(cubo_particionado, meses),
+             'ocorrencias_por_mes': graficos.ocorrencias_por_mes(cubo_particionado)})
+
+
+def grupo_regioes(cubo_particionado):
+    anos = _anos(cubo_particionado) + ['Todos']
+    tabelas = {'regioes_por_ano': _por_filtro(agregacoes.regioes_do_ano, cubo_particionado, 'ano', anos),
+               'ocorrencias_por_regiao': agregacoes.ocorrencias_por_regiao(cubo_particionado)}
+    figuras = {f'regioes_{ano}': graficos.regioes_do_ano(cubo_particionado, ano) for ano in anos}
+    figuras['ocorrencias_por_regiao'] = graficos.ocorrencias_por_regiao(cubo_particionado)
+    return tabelas, figuras
+
+
+def grupo_top_crimes(cubo_particionado):
+    anos = _anos(cubo_particionado) + ['Todos']
+    return ({'top_crimes_por_regiao': _por_filtro(agregacoes.top_crimes_por_regiao, cubo_particionado, 'ano', anos)},
+            {f'top_crimes_{ano}': graficos.top_crimes_por_regiao(cubo_particionado, ano) for ano in anos})
+
+
+def grupo_estatisticas(cubo_particionado):
+    # Todas as tabelas de medidas (anos, regiões e 'Todos') saem de uma passada
+    return {'medidas': agregacoes.tabelas_estatisticas(cubo_particionado)}, {}
+
+
+GRUPOS = {
+    'anos': grupo_anos,
+    'meses': grupo_meses,
+    'regioes': grupo_regioes,
+    'top_crimes': grupo_top_crimes,
+    'estatisticas': grupo_estatisticas,
+}
+
+
+def _para_arquivo(tabela):
+    # Colunas com tipos misturados (ex.: medidas numéricas e a moda, anos e 'Todos') viram texto no Parquet
+    tabela = tabela.copy()
+    for coluna in tabela.columns[tabela.dtypes == object]:
+        if tabela[coluna].map(type).nunique() > 1:
+            tabela[coluna] = tabela[coluna].astype(str)
+    return tabela
+
+
+def exportar_grupo(nome, tabela_cubo, saida, formatos):
+    """Calcula e grava um grupo de relatórios; roda num processo separado. Retorna (arquivos, segundos)."""
+    inicio = time.perf_counter()
+    tabelas, figuras = GRUPOS[nome](particoes.Particoes(tabela_cubo))
+    diretorio = os.path.join(saida, nome)
+    os.makedirs(diretorio, exist_ok=True)
+
+    arquivos = []
+    for nome_tabela, tabela in tabelas.items():
+        tabela = _para_arquivo(tabela)
+        for formato in formatos:
+            caminho = os.path.join(diretorio, f"{nome_tabela}.{formato}")
+            if formato == 'parquet':
+                tabela.to_parquet(caminho, index=False)
+            else:
+                tabela.to_csv(caminho, index=False)
+            arquivos.append(caminho)
+    for nome_figura, figura in figuras.items():
+        caminho = os.path.join(diretorio, f"{nome_figura}.html")
+        # plotly.js vem de CDN: cada HTML fica com poucos kB
+        figura.write_html(caminho, include_plotlyjs='cdn')
+        arquivos.append(caminho)
+    return arquivos, time.perf_counter() - inicio
+
+
+def exportar(caminho, saida, formatos=('parquet',), grupos=None, processos=None, tamanho_bloco=None):
+    """Carrega os dados e exporta os grupos em paralelo; retorna {grupo: (arquivos, segundos)} e o relatório da carga."""
+    cubo_particionado, relatorio = dados.carregar_painel(caminho, tamanho_bloco, processos)
+    grupos = list(grupos or GRUPOS)
+    resultados = {}
+    # Cada processo recebe só o cubo de contagens, que é pequeno
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        tarefas = {executor.submit(exportar_grupo, nome, cubo_particionado.tabela, saida, list(formatos)): nome
+                   for nome in grupos}
+        for tarefa in as_completed(tarefas):
+            resultados[tarefas[tarefa]] = tarefa.result()
+    return resultados, relatorio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("csv", nargs="?", default=dados.CAMINHO_CSV, help="CSV ou padrão de arquivos")
+    parser.add_argument("--saida", default="relatorios", help="diretório de saída")
+    parser.add_argument("--formatos", nargs="+", choices=FORMATOS, default=['parquet'])
+    parser.add_argument("--grupos", nargs="+", choices=list(GRUPOS), help="grupos a exportar (padrão: todos)")
+    parser.add_argument("--processos", type=int, help="processos para a ingestão e para os grupos")
+    parser.add_argument("--bloco", type=int, help="lê o CSV em blocos com este número de linhas")
+    argumentos = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resultados, relatorio = exportar(argumentos.csv, argumentos.saida, argumentos.formatos, argumentos.grupos,
+                                     argumentos.processos, argumentos.bloco)
+    print(f"{'grupo':<14} {'arquivos':>8} {'tempo (s)':>10}")
+    for nome, (arquivos, tempo) in resultados.items():
+        print(f"{nome:<14} {len(arquivos):>8} {tempo:>10.2f}")
+    print(f"versão {relatorio['versao']}; total {time.perf_counter() - inicio:.2f} s em {argumentos.saida}")
+
+
+if __name__ == "__main__":
+    main()
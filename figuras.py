@@ -0,0 +1,169 @@
+import logging
+
+import numpy as np
+import streamlit as st
+
+# Orçamento de cada figura enviada ao navegador: o JSON do Plotly vai inteiro, e o tempo de
+# renderização cresce com ele
+LIMITE_BYTES = 500_000
+# Séries temporais com mais pontos que isso por traço passam por LTTB
+MAX_PONTOS = 2_000
+# Eixos categóricos (barras) e fatias (pizza) além disso viram top-N mais "Outros"
+MAX_CATEGORIAS = 30
+ROTULO_OUTROS = 'Outros'
+# Figuras prontas guardadas por função de construção (uma por combinação de versão e seletores)
+MAX_FIGURAS = 32
+
+# Atributos alinhados ponto a ponto com x/y, que precisam ser reduzidos junto
+ATRIBUTOS_POR_PONTO = ['x', 'y', 'text', 'hovertext', 'customdata']
+
+logger = logging.getLogger(__name__)
+
+# Tamanho serializado de cada figura exibida neste processo: {nome: (bytes originais, bytes enviados)}
+tamanhos_figuras = {}
+
+
+def lttb(x, y, pontos):
+    """Índices dos pontos mantidos pelo Largest-Triangle-Three-Buckets (x em ordem crescente).
+
+    O primeiro e o último ponto são sempre mantidos; de cada balde intermediário fica o ponto que
+    forma o maior triângulo com o ponto escolhido antes e a média do balde seguinte.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if pontos >= n:
+        return np.arange(n)
+    if pontos < 3:
+        return np.array([0, n - 1])
+
+    # pontos - 2 baldes entre o primeiro e o último ponto; como pontos < n, nenhum fica vazio
+    limites = np.linspace(1, n - 1, pontos - 1).astype(int)
+    indices = np.empty(pontos, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    anterior = 0
+    for balde in range(pontos - 2):
+        inicio, fim = limites[balde], limites[balde + 1]
+        if balde + 2 < len(limites):
+            proximo = slice(limites[balde + 1], limites[balde + 2])
+        else:
+            proximo = slice(n - 1, n)
+        media_x, media_y = x[proximo].mean(), y[proximo].mean()
+        areas = np.abs((x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+                       - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior]))
+        anterior = inicio + int(np.argmax(areas))
+        indices[balde + 1] = anterior
+    return indices
+
+
+def _valores_x(x):
+    # Datas viram números para o cálculo das áreas; eixos categóricos usam a posição
+    valores = np.asarray(x)
+    if np.issubdtype(valores.dtype, np.datetime64):
+        return valores.astype('datetime64[ns]').astype(np.int64)
+    if np.issubdtype(valores.dtype, np.number):
+        return valores
+    return np.arange(len(valores))
+
+
+def _selecionar(traco, indices):
+    n = len(traco.x)
+    alteracoes = {}
+    for atributo in ATRIBUTOS_POR_PONTO:
+        valores = traco[atributo]
+        if valores is not None and not isinstance(valores, str) and len(valores) == n:
+            alteracoes[atributo] = [valores[i] for i in indices]
+    traco.update(alteracoes)
+
+
+def _reduzir_series(fig, pontos):
+    reduziu = False
+    for traco in fig.data:
+        if traco.type not in ('scatter', 'scattergl') or traco.x is None or traco.y is None or len(traco.x) <= pontos:
+            continue
+        _selecionar(traco, lttb(_valores_x(traco.x), traco.y, pontos))
+        reduziu = True
+    return reduziu
+
+
+def _agrupar_barras(fig, n):
+    """Mantém as n categorias do eixo x com maior total somando todos os traços de barras; o resto vira "Outros"."""
+    barras = [traco for traco in fig.data if traco.type == 'bar' and traco.x is not None and traco.y is not None]
+    totais = {}
+    for traco in barras:
+        for categoria, valor in zip(traco.x, traco.y):
+            totais[categoria] = totais.get(categoria, 0) + (valor or 0)
+    if len(totais) <= n:
+        return False
+
+    mantidas = set(sorted(totais, key=totais.get, reverse=True)[:n])
+    for traco in barras:
+        indices = [i for i, categoria in enumerate(traco.x) if categoria in mantidas]
+        resto = sum(valor or 0 for categoria, valor in zip(traco.x, traco.y) if categoria not in mantidas)
+        _selecionar(traco, indices)
+        if resto:
+            # O ponto "Outros" não tem texto nem customdata próprios
+            alteracoes = {'x': list(traco.x) + [ROTULO_OUTROS], 'y': list(traco.y) + [resto]}
+            for atributo in ATRIBUTOS_POR_PONTO[2:]:
+                valores = traco[atributo]
+                if valores is not None and not isinstance(valores, str):
+                    alteracoes[atributo] = list(valores) + [None]
+            traco.update(alteracoes)
+    return True
+
+
+def _agrupar_fatias(fig, n):
+    reduziu = False
+    for traco in fig.data:
+        if traco.type != 'pie' or traco.labels is None or traco.values is None or len(traco.labels) <= n:
+            continue
+        ordem = np.argsort(np.asarray(traco.values, dtype=float), kind='stable')[::-1]
+        mantidos, resto = ordem[:n], ordem[n:]
+        valores = np.asarray(traco.values, dtype=float)
+        traco.update(labels=[traco.labels[i] for i in mantidos] + [ROTULO_OUTROS],
+                     values=list(valores[mantidos]) + [valores[resto].sum()])
+        reduziu = True
+    return reduziu
+
+
+def _tamanho(fig):
+    return len(fig.to_json().encode('utf-8'))
+
+
+def limitar(fig, limite_bytes=LIMITE_BYTES, max_pontos=MAX_PONTOS, max_categorias=MAX_CATEGORIAS):
+    """Reduz a figura (no lugar) até caber no orçamento; retorna (bytes originais, bytes finais).
+
+    Primeiro aplica os limites fixos de pontos e categorias. Se ainda passar do orçamento, as
+    séries temporais são reamostradas com menos pontos, na proporção do excesso.
+    """
+    original = _tamanho(fig)
+    # `|` em vez de `or`: os três limites são sempre aplicados
+    reduziu = _reduzir_series(fig, max_pontos) | _agrupar_barras(fig, max_categorias) | _agrupar_fatias(fig, max_categorias)
+    tamanho = _tamanho(fig) if reduziu else original
+
+    while tamanho > limite_bytes:
+        maior_serie = max((len(traco.x) for traco in fig.data
+                           if traco.type in ('scatter', 'scattergl') and traco.x is not None), default=0)
+        pontos = int(maior_serie * limite_bytes / tamanho * 0.9)
+        if pontos < 3 or not _reduzir_series(fig, pontos):
+            logger.warning("Figura com %d bytes acima do orçamento de %d bytes", tamanho, limite_bytes)
+            break
+        tamanho = _tamanho(fig)
+    return original, tamanho
+
+
+def preparar(fig, limite_bytes=LIMITE_BYTES):
+    """Aplica o orçamento e devolve (fig, bytes originais, bytes enviados), para guardar em cache.
+
+    A figura preparada não deve mais ser alterada: o cache a compartilha entre execuções e sessões.
+    """
+    original, enviado = limitar(fig, limite_bytes)
+    return fig, original, enviado
+
+
+def exibir(preparada, nome):
+    """st.plotly_chart de uma figura de `preparar`, registrando o tamanho serializado."""
+    fig, original, enviado = preparada
+    tamanhos_figuras[nome] = (original, enviado)
+    logger.info("%s: %d bytes (%d antes da redução)", nome, enviado, original)
+    st.plotly_chart(fig)
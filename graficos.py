@@ -0,0 +1,181 @@
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+import agregacoes
+
+# Figuras do painel, construídas só a partir do cubo particionado e dos valores dos seletores. Não
+# dependem do Streamlit: o painel as exibe e a exportação em lote as grava em HTML.
+
+NOMES_MESES = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+               'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
+
+
+def crimes_por_ano(cubo_particionado):
+    crimes_anos = agregacoes.crimes_por_ano(cubo_particionado)
+
+    # Criar o gráfico de pizza usando Plotly
+    fig1 = px.pie(
+        crimes_anos, 
+        values='QTD', 
+        names='ANO_BO', 
+        title='Quantidades de Ocorrências por Ano', 
+        labels={'QTD': 'Quantidade', 'ANO_BO': 'Ano'},
+        color_discrete_map={
+            '2022': 'rgb(28, 10, 248)',  # Azul para 2022
+            '2023': 'rgb(255, 99, 71)',  # Vermelho para 2023
+            '2024': 'rgb(60, 179, 113)'  # Verde opaco para 2024
+        }
+    )
+    return fig1
+
+
+def contagem_por_mes(cubo_particionado, meses_selecionados):
+    agrupados = agregacoes.contagem_por_mes(cubo_particionado, meses_selecionados, 5)
+
+    # Definir as cores específicas para cada ano
+    colors = {
+        2022: 'rgba(100, 149, 237, 0.6)',  # Azul para 2022
+        2023: 'rgba(255, 99, 71, 0.6)',  # Vermelho para 2023
+        2024: 'rgba(60, 179, 113, 0.6)'  # Verde opaco para 2024
+    }
+
+    # Criar o gráfico de barras usando Plotly
+    fig2 = go.Figure()
+
+    # Adicionar barras para cada mês e ano
+    for ano in [2022, 2023, 2024]:
+        for mes in meses_selecionados:
+            dados_mes_ano = agrupados[(agrupados['MES_ESTATISTICA'] == mes) & (agrupados['ANO_BO'] == ano)]
+            if not dados_mes_ano.empty:
+                show_legend = mes == meses_selecionados[0]  # Mostrar a legenda apenas para o primeiro mês
+                fig2.add_trace(go.Bar(
+                    x=[mes],
+                    y=dados_mes_ano['count'],
+                    name=str(ano),
+                    marker_color=colors[ano],
+                    hovertemplate='<b>Mês:</b> %{x}<br><b>Ano:</b> %{customdata}<br><b>Contagem:</b> %{y}<br><b>Crimes:</b><br>%{hovertext}',
+                    customdata=[ano],
+                    hovertext=dados_mes_ano['hover_text'],
+                    showlegend=show_legend
+                ))
+
+    # Ajustar o layout do gráfico
+    fig2.update_layout(
+        title='Contagem de Ocorrências por Mês e Ano',
+        xaxis=dict(
+            tickmode='array',
+            tickvals=meses_selecionados,
+            ticktext=[NOMES_MESES[mes - 1] for mes in meses_selecionados]
+        ),
+        barmode='group',  # Garantir que as barras estejam lado a lado
+        legend_title_text='Ano',
+        legend=dict(
+            orientation='h',
+            yanchor='bottom',
+            y=1.02,
+            xanchor='right',
+            x=1
+        )
+    )
+    return fig2
+
+
+def ocorrencias_por_mes(cubo_particionado):
+    ocorrencias_agrupadas = agregacoes.ocorrencias_por_mes(cubo_particionado)
+
+    # Criar o gráfico de linhas usando Plotly
+    fig3 = px.line(
+        ocorrencias_agrupadas,
+        x='MES_ESTATISTICA',
+        y='QTD',
+        color='ANO_BO',
+        title='Quantidade de Ocorrências por Mês e Ano',
+        labels={'MES_ESTATISTICA': 'Mês', 'QTD': 'Quantidade', 'ANO_BO': 'Ano'},
+        color_discrete_map={
+            '2022': 'rgba(28, 10, 248, 0.6)',  # Azul para 2022
+            '2023': 'rgba(255, 99, 71, 0.6)',  # Vermelho para 2023
+            '2024': 'rgba(60, 179, 113, 0.6)'  # Verde opaco para 2024
+        }
+    )
+    return fig3
+
+
+def pizza_regioes(cubo_particionado, ano):
+    ocorrencias = agregacoes.regioes_do_ano(cubo_particionado, ano)
+    labels = ocorrencias['regiao']
+    values = ocorrencias['QTD']
+    return go.Pie(labels=labels, values=values, hole=.4, name=str(ano))
+
+
+def regioes_do_ano(cubo_particionado, ano_escolhido):
+    # Criar subplots com até três gráficos de pizza, dependendo da seleção
+    fig4 = make_subplots(rows=1, cols=3 if ano_escolhido == 'Todos' else 1, specs=[[{'type':'domain'}] * (3 if ano_escolhido == 'Todos' else 1)])
+
+    if ano_escolhido == 'Todos':
+        fig4.add_trace(pizza_regioes(cubo_particionado, 2022), 1, 1)
+        fig4.add_trace(pizza_regioes(cubo_particionado, 2023), 1, 2)
+        fig4.add_trace(pizza_regioes(cubo_particionado, 2024), 1, 3)
+        annotations = [
+            dict(text='2022', x=0.11, y=0.5, font_size=20, showarrow=False),
+            dict(text='2023', x=0.5, y=0.5, font_size=20, showarrow=False),
+            dict(text='2024', x=0.89, y=0.5, font_size=20, showarrow=False)
+        ]
+    else:
+        ano = int(ano_escolhido)
+        fig4.add_trace(pizza_regioes(cubo_particionado, ano), 1, 1)
+        annotations = [dict(text=str(ano), x=0.5, y=0.5, font_size=20, showarrow=False)]
+
+    fig4.update_layout(title_text="Regiões Mais Perigosas Anualmente", annotations=annotations)
+    return fig4
+
+
+def ocorrencias_por_regiao(cubo_particionado):
+    ocorrencias_por_regiao = agregacoes.ocorrencias_por_regiao(cubo_particionado)
+
+    # Criar o gráfico de funil usando Plotly
+    fig5 = go.Figure(go.Funnel(
+        y=ocorrencias_por_regiao['regiao'],
+        x=ocorrencias_por_regiao['QTD'],
+        textinfo="value+percent total",
+        hoverinfo="name+percent total"
+    ))
+
+    # Atualizar o layout do gráfico
+    fig5.update_layout(
+        title_text="Regiões Mais Perigosas - Gráfico de Funil",
+        xaxis_title='Quantidade de Ocorrências',
+        yaxis_title='Região'  # Aqui foi corrigido de 'yashis_title' para 'yaxis_title'
+    )
+    return fig5
+
+
+def top_crimes_por_regiao(cubo_particionado, ano_escolhido_crime):
+    top_crimes_por_regiao = agregacoes.top_crimes_por_regiao(cubo_particionado, ano_escolhido_crime, 5)
+
+    # Criar um gráfico de barras usando Plotly
+    fig6 = go.Figure()
+
+    # Adicionar as barras para cada região e natureza de crime
+    for natureza in top_crimes_por_regiao['NATUREZA_APURADA'].unique():
+        dados_filtrados = top_crimes_por_regiao[top_crimes_por_regiao['NATUREZA_APURADA'] == natureza]
+
+        fig6.add_trace(go.Bar(
+            x=dados_filtrados['regiao'],
+            y=dados_filtrados['QTD'],
+            name=f"{natureza} ({dados_filtrados['Porcentagem'].round(2).astype(str).values[0]}%)",
+            hovertemplate='<b>Região:</b> %{x}<br>' +
+                          '<b>Quantidade:</b> %{y}<br>' +
+                          '<b>Porcentagem:</b> %{customdata:.2f}%',
+            customdata=dados_filtrados['Porcentagem'].values,
+        ))
+
+    # Ajustar o layout do gráfico
+    fig6.update_layout(
+        title='Top Crimes por Região',
+        xaxis_title='Região',
+        yaxis_title='Quantidade',
+        barmode='group',  # Agrupar as barras por região
+        legend_title='Natureza do Crime'
+    )
+    return fig6
@@ -0,0 +1,55 @@
+import importlib
+import subprocess
+import sys
+import time
+
+# Módulos fora do caminho de renderização: análises estatísticas e normalização dos rótulos na limpeza
+MODULOS_PESADOS = ['scipy.stats', 'statsmodels.api', 'statsmodels.formula.api', 'unidecode']
+
+# Tempo gasto em cada importação tardia feita neste processo, em segundos
+tempos_importacao = {}
+
+
+def importar(nome):
+    """Importa um módulo só quando um recurso precisa dele, registrando o tempo da primeira importação."""
+    if nome in sys.modules:
+        return sys.modules[nome]
+    inicio = time.perf_counter()
+    modulo = importlib.import_module(nome)
+    tempos_importacao[nome] = time.perf_counter() - inicio
+    return modulo
+
+
+def medir_importacao(modulos, limite=None):
+    """Relatório no formato de `python -X importtime` para importar `modulos` em um processo novo.
+
+    Retorna uma lista de dicionários (modulo, nivel, proprio_us, acumulado_us), ordenada pelo
+    tempo acumulado; `limite` mantém só as primeiras linhas.
+    """
+    codigo = "; ".join(f"import {modulo}" for modulo in modulos)
+    processo = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo],
+                              capture_output=True, text=True, check=True)
+    linhas = []
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, acumulado, nome = linha[len("import time:"):].split("|")
+        # Cada nível de importação aninhada acrescenta dois espaços antes do nome
+        nivel = (len(nome) - len(nome.lstrip(" ")) - 1) // 2
+        linhas.append({"modulo": nome.strip(), "nivel": nivel,
+                       "proprio_us": int(proprio), "acumulado_us": int(acumulado)})
+    linhas.sort(key=lambda item: item["acumulado_us"], reverse=True)
+    return linhas[:limite] if limite else linhas
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tempo de importação no estilo de python -X importtime.")
+    parser.add_argument("modulos", nargs="*", default=["streamlit", "pandas", "plotly.graph_objects"] + MODULOS_PESADOS)
+    parser.add_argument("--limite", type=int, default=25)
+    argumentos = parser.parse_args()
+
+    print(f"{'próprio [us]':>12} | {'acumulado [us]':>14} | módulo")
+    for item in medir_importacao(argumentos.modulos, argumentos.limite):
+        print(f"{item['proprio_us']:>12} | {item['acumulado_us']:>14} | {'  ' * item['nivel']}{item['modulo']}")
@@ -0,0 +1,110 @@
+import os
+from itertools import repeat
+
+import numpy as np
+
+import cubo
+import importacao
+import paralelo
+
+# Testes de significância calculados sobre o cubo de contagens, nunca sobre as linhas: a tabela de
+# contingência região x natureza e as séries mensais por ano saem de somas do cubo particionado.
+
+# Repetições padrão do bootstrap e nível dos intervalos de confiança
+REPETICOES = 1000
+NIVEL = 0.95
+# Abaixo disso por processo o bootstrap roda no próprio processo: abrir o pool custa mais que as repetições
+REPETICOES_POR_PROCESSO = 100_000
+
+
+def tabela_contingencia(cubo_particionado, ano='Todos'):
+    """Contagens região x natureza no ano (ou em todos), sem linhas e colunas vazias."""
+    contagens = cubo.somar(cubo_particionado.visao(ANO_BO=ano), ['regiao', 'NATUREZA_APURADA'])
+    contagens = contagens.astype({'regiao': str, 'NATUREZA_APURADA': str})
+    tabela = contagens.pivot(index='regiao', columns='NATUREZA_APURADA', values='QTD').fillna(0).astype('int64')
+    return tabela.loc[tabela.sum(axis=1) > 0, tabela.sum(axis=0) > 0]
+
+
+def cramer_v(observadas):
+    """V de Cramér de uma tabela de contingência ou de um lote delas (nos dois últimos eixos)."""
+    observadas = np.asarray(observadas, dtype=float)
+    total = observadas.sum(axis=(-2, -1), keepdims=True)
+    esperadas = observadas.sum(axis=-1, keepdims=True) * observadas.sum(axis=-2, keepdims=True) / total
+    with np.errstate(invalid='ignore', divide='ignore'):
+        parcelas = np.where(esperadas > 0, (observadas - esperadas) ** 2 / esperadas, 0.0)
+    qui2 = parcelas.sum(axis=(-2, -1))
+    linhas, colunas = observadas.shape[-2:]
+    return np.sqrt(qui2 / (total[..., 0, 0] * (min(linhas, colunas) - 1)))
+
+
+def qui_quadrado(tabela):
+    """Teste de independência entre as linhas e as colunas da tabela (scipy.stats.chi2_contingency)."""
+    stats = importacao.importar('scipy.stats')
+    estatistica, p_valor, graus_liberdade, _ = stats.chi2_contingency(tabela.to_numpy())
+    return {
+        'qui2': float(estatistica),
+        'p_valor': float(p_valor),
+        'graus_liberdade': int(graus_liberdade),
+        'v_cramer': float(cramer_v(tabela.to_numpy())),
+    }
+
+
+def series_mensais(cubo_particionado, regiao='Todos'):
+    """Ocorrências de cada mês de cada ano na região (ou em todas)."""
+    return cubo.somar(cubo_particionado.visao(regiao=regiao), ['ANO_BO', 'MES_ESTATISTICA'])
+
+
+def anova_anos(series):
+    """ANOVA de um fator: o ano explica as contagens mensais? (statsmodels, QTD ~ C(ANO_BO))."""
+    smf = importacao.importar('statsmodels.formula.api')
+    sm = importacao.importar('statsmodels.api')
+    modelo = smf.ols('QTD ~ C(ANO_BO)', data=series).fit()
+    return sm.stats.anova_lm(modelo, typ=2)
+
+
+def _reamostrar_medias(series, repeticoes, semente):
+    # Média mensal de cada ano reamostrando os meses do próprio ano: (repeticoes, anos)
+    gerador = np.random.default_rng(semente)
+    return np.column_stack([gerador.choice(valores, (repeticoes, len(valores))).mean(axis=1) for valores in series])
+
+
+def bootstrap(funcao, dados, repeticoes=REPETICOES, processos=None, semente=0):
+    """Distribuição bootstrap de `funcao(dados, repeticoes, semente)`, com as repetições divididas entre processos.
+
+    Cada processo recebe uma semente independente (SeedSequence.spawn); o resultado é reprodutível
+    para a mesma semente e o mesmo número de processos. Só há um processo para cada
+    REPETICOES_POR_PROCESSO repetições, e os processos saem de um forkserver (paralelo.mapear): o
+    painel chama esta função de threads do servidor.
+    """
+    processos = max(1, min(processos or os.cpu_count() or 1, repeticoes // REPETICOES_POR_PROCESSO))
+    tamanhos = [len(parte) for parte in np.array_split(np.arange(repeticoes), processos)]
+    sementes = np.random.SeedSequence(semente).spawn(processos)
+    if processos == 1:
+        return funcao(dados, tamanhos[0], sementes[0])
+    return np.concatenate(paralelo.mapear(funcao, repeat(dados, processos), tamanhos, sementes, processos=processos))
+
+
+def intervalo(distribuicao, nivel=NIVEL):
+    """Intervalo percentil (inferior, superior) de uma distribuição bootstrap, por coluna."""
+    alfa = (1 - nivel) / 2
+    return np.nanquantile(distribuicao, [alfa, 1 - alfa], axis=0)
+
+
+def analise_qui_quadrado(cubo_particionado, ano='Todos'):
+    """Tabela de contingência e resultado do qui-quadrado.
+
+    O V de Cramér não tem intervalo bootstrap: ele nunca é negativo e as reamostras ficam acima da
+    estimativa, então o intervalo percentil pode nem conter o valor observado quando não há associação.
+    """
+    tabela = tabela_contingencia(cubo_particionado, ano)
+    return tabela, qui_quadrado(tabela)
+
+
+def analise_anova(cubo_particionado, regiao='Todos', repeticoes=REPETICOES, processos=None):
+    """Tabela da ANOVA e média mensal de cada ano, com intervalos de confiança se `repeticoes`."""
+    series = series_mensais(cubo_particionado, regiao)
+    medias = series.groupby('ANO_BO')['QTD'].agg(meses='count', media_mensal='mean')
+    if repeticoes:
+        valores = [grupo.to_numpy(dtype=float) for _, grupo in series.groupby('ANO_BO')['QTD']]
+        medias['inferior'], medias['superior'] = intervalo(bootstrap(_reamostrar_medias, valores, repeticoes, processos))
+    return anova_anos(series), medias.reset_index()
@@ -0,0 +1,35 @@
+import contextlib
+import multiprocessing
+import sys
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+# Os processos de trabalho saem de um forkserver: o painel cria pools a partir de threads do servidor,
+# onde um fork direto pode herdar travas seguras por outras threads e travar
+CONTEXTO = multiprocessing.get_context('forkserver')
+
+
+@contextlib.contextmanager
+def _sem_script_principal():
+    # O Streamlit instala o script do painel como __main__, e cada processo novo do forkserver (como no
+    # spawn) executaria o script inteiro de novo. Os processos só rodam funções de módulos importáveis,
+    # então, enquanto são criados, o multiprocessing vê um __main__ vazio
+    principal = sys.modules['__main__']
+    sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = principal
+
+
+def mapear(funcao, *iteraveis, processos=None):
+    """Equivale a list(map(funcao, *iteraveis)), com cada chamada em um processo do forkserver.
+
+    `funcao` precisa ser de um módulo importável (não do script do painel). Os resultados voltam na
+    ordem dos argumentos.
+    """
+    with ProcessPoolExecutor(max_workers=processos, mp_context=CONTEXTO) as executor:
+        # Os processos são criados a cada submit, enquanto houver chamadas esperando e vagas no pool
+        with _sem_script_principal():
+            tarefas = [executor.submit(funcao, *argumentos) for argumentos in zip(*iteraveis)]
+        return [tarefa.result() for tarefa in tarefas]
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+# Chaves de partição: os filtros do painel são sempre por ano e/ou região
+CHAVES = ['ANO_BO', 'regiao']
+
+
+def ignorar_filtro(valor):
+    # None e 'Todos' significam "sem filtro" em todos os seletores do painel
+    return valor is None or (isinstance(valor, str) and valor == 'Todos')
+
+
+class Particoes:
+    """DataFrame ordenado uma única vez pelas chaves, com o deslocamento de cada partição.
+
+    As visões filtradas são fatias contíguas (iloc) da tabela ordenada, sem máscara
+    booleana e sem cópia das linhas.
+    """
+
+    def __init__(self, df, chaves=CHAVES):
+        self.chaves = list(chaves)
+        self.tabela = df.sort_values(self.chaves, kind='stable').reset_index(drop=True)
+
+        # dropna=False: linhas com região em branco ficam no fim da partição do ano, e não fora dela
+        tamanhos = self.tabela.groupby(self.chaves, observed=True, sort=False, dropna=False).size()
+        fins = np.cumsum(tamanhos.to_numpy())
+        inicios = fins - tamanhos.to_numpy()
+        # {(ano, regiao): (inicio, fim)} e, para a primeira chave, {ano: (inicio, fim)}
+        self.deslocamentos = {chave: (int(inicio), int(fim)) for chave, inicio, fim in zip(tamanhos.index, inicios, fins)}
+        self.deslocamentos_primeira = {}
+        for (primeira, _), (inicio, fim) in self.deslocamentos.items():
+            atual = self.deslocamentos_primeira.get(primeira, (inicio, fim))
+            self.deslocamentos_primeira[primeira] = (min(atual[0], inicio), max(atual[1], fim))
+
+    def __len__(self):
+        return len(self.tabela)
+
+    def _fatia(self, intervalo):
+        inicio, fim = intervalo if intervalo is not None else (0, 0)
+        return self.tabela.iloc[inicio:fim]
+
+    def visao(self, **filtros):
+        """Linhas que atendem aos filtros das chaves de partição (ex.: ANO_BO=2023, regiao='zona_Sul')."""
+        desconhecidas = set(filtros) - set(self.chaves)
+        if desconhecidas:
+            raise KeyError(f"Filtro fora das chaves de partição: {', '.join(sorted(desconhecidas))}")
+
+        primeira, segunda = (filtros.get(chave) for chave in self.chaves)
+        if ignorar_filtro(primeira) and ignorar_filtro(segunda):
+            return self.tabela
+        if ignorar_filtro(segunda):
+            return self._fatia(self.deslocamentos_primeira.get(primeira))
+        if not ignorar_filtro(primeira):
+            return self._fatia(self.deslocamentos.get((primeira, segunda)))
+
+        # Só a segunda chave: uma fatia por valor da primeira, que precisam ser concatenadas
+        fatias = [self._fatia(self.deslocamentos[chave]) for chave in self.deslocamentos if chave[1] == segunda]
+        if not fatias:
+            return self._fatia(None)
+        return pd.concat(fatias, ignore_index=True)
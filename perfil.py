@@ -0,0 +1,137 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import streamlit as st
+
+# O modo de perfil é ligado por DADOS_CRIMINAIS_PERFIL=1 ou pelo parâmetro ?perfil=1 na URL
+VARIAVEL_AMBIENTE = "DADOS_CRIMINAIS_PERFIL"
+# Se definido, cada execução acrescenta seus registros (JSON lines) a este arquivo
+VARIAVEL_ARQUIVO = "DADOS_CRIMINAIS_PERFIL_ARQUIVO"
+
+
+def perfil_ativo():
+    return os.environ.get(VARIAVEL_AMBIENTE) == "1" or st.query_params.get("perfil") == "1"
+
+
+class Perfil:
+    """Mede tempo, memória alocada e acerto de cache de cada seção de uma execução do script.
+
+    Inativo, `secao` não mede nada e `cache_data`/`cache_resource` equivalem aos decoradores do Streamlit.
+    Seções podem rodar em threads diferentes: o acerto de cache e o aninhamento são por thread. O
+    tracemalloc não separa as alocações por thread, então a memória só é registrada para seções que
+    não se sobrepuseram a seções de outras threads; nas demais fica None.
+    """
+
+    def __init__(self, ativo):
+        self.ativo = ativo
+        self.registros = []
+        # Contadores de chamadas e execuções reais das funções em cache e profundidade das seções, por thread
+        self._local = threading.local()
+        # Seções de primeiro nível abertas em todas as threads e quantas já começaram; o pico do
+        # tracemalloc é global e só é zerado quando nenhuma outra seção está aberta
+        self._trava = threading.Lock()
+        self._abertas = 0
+        self._iniciadas = 0
+        if ativo and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def cache_data(self, funcao=None, **opcoes):
+        """Substitui @st.cache_data contando chamadas e execuções reais, para saber se houve acerto."""
+        if funcao is None:
+            return functools.partial(self.cache_data, **opcoes)
+        return self._contar(st.cache_data, funcao, opcoes)
+
+    def cache_resource(self, funcao=None, **opcoes):
+        """Substitui @st.cache_resource da mesma forma que `cache_data`."""
+        if funcao is None:
+            return functools.partial(self.cache_resource, **opcoes)
+        return self._contar(st.cache_resource, funcao, opcoes)
+
+    def _contar(self, decorador, funcao, opcoes):
+        @functools.wraps(funcao)
+        def corpo(*args, **kwargs):
+            # Só roda quando o cache erra
+            self._local.execucoes = self._contagem('execucoes') + 1
+            return funcao(*args, **kwargs)
+
+        cacheada = decorador(corpo, **opcoes)
+
+        @functools.wraps(funcao)
+        def chamada(*args, **kwargs):
+            self._local.chamadas = self._contagem('chamadas') + 1
+            return cacheada(*args, **kwargs)
+
+        chamada.clear = cacheada.clear
+        return chamada
+
+    def _contagem(self, nome):
+        return getattr(self._local, nome, 0)
+
+    @contextmanager
+    def secao(self, nome):
+        if not self.ativo:
+            yield
+            return
+
+        chamadas, execucoes = self._contagem('chamadas'), self._contagem('execucoes')
+        primeiro_nivel = self._contagem('profundidade') == 0
+        with self._trava:
+            if primeiro_nivel:
+                if self._abertas == 0:
+                    tracemalloc.reset_peak()
+                self._abertas += 1
+                self._iniciadas += 1
+            # A seção de primeiro nível desta thread conta como uma das abertas
+            outras, iniciadas = self._abertas - 1, self._iniciadas
+            memoria_inicial, _ = tracemalloc.get_traced_memory()
+        self._local.profundidade = self._contagem('profundidade') + 1
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            tempo = time.perf_counter() - inicio
+            self._local.profundidade -= 1
+            with self._trava:
+                _, pico = tracemalloc.get_traced_memory()
+                # Sozinha: nenhuma seção de outra thread estava aberta no início nem começou depois
+                sozinha = outras == 0 and self._iniciadas == iniciadas
+                if primeiro_nivel:
+                    self._abertas -= 1
+            if self._contagem('chamadas') == chamadas:
+                cache = None
+            else:
+                cache = "falha" if self._contagem('execucoes') > execucoes else "acerto"
+            self.registros.append({
+                "secao": nome,
+                "tempo_ms": round(tempo * 1000, 3),
+                "memoria_mb": round(max(pico - memoria_inicial, 0) / 1e6, 3) if sozinha else None,
+                "cache": cache,
+                "momento": time.time(),
+            })
+
+    def registrar(self, nome, segundos):
+        """Registra um tempo medido fora de `secao` (ex.: tempo até a primeira pintura)."""
+        if self.ativo:
+            self.registros.append({"secao": nome, "tempo_ms": round(segundos * 1000, 3),
+                                   "memoria_mb": None, "cache": None, "momento": time.time()})
+
+    def jsonl(self):
+        return "\n".join(json.dumps(registro, ensure_ascii=False) for registro in self.registros)
+
+    def mostrar(self):
+        """Painel recolhível na barra lateral, com exportação em JSON lines."""
+        if not self.ativo:
+            return
+        caminho = os.environ.get(VARIAVEL_ARQUIVO)
+        if caminho and self.registros:
+            with open(caminho, "a", encoding="utf-8") as arquivo:
+                arquivo.write(self.jsonl() + "\n")
+
+        with st.sidebar.expander("Perfil de execução"):
+            st.dataframe(self.registros, hide_index=True)
+            st.download_button("Exportar (JSON lines)", self.jsonl(), file_name="perfil.jsonl", mime="application/jsonl")
@@ -0,0 +1,70 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# Tarefas em segundo plano ao mesmo tempo em cada execução do script (carga e agregações)
+TAREFAS_SIMULTANEAS = 4
+MENSAGEM_CARREGANDO = "Carregando…"
+
+
+class Pagina:
+    """Página progressiva: o texto é enviado na hora e cada seção pesada ganha um espaço reservado,
+    preenchido quando a sua tarefa termina numa thread em segundo plano.
+
+    Mede o tempo até a primeira pintura (primeiro texto enviado ao navegador) e até a página completa.
+    """
+
+    def __init__(self, perfil, tarefas_simultaneas=TAREFAS_SIMULTANEAS):
+        self.inicio = time.perf_counter()
+        self.perfil = perfil
+        self.executor = ThreadPoolExecutor(tarefas_simultaneas)
+        self.contexto = get_script_run_ctx()
+        self.reservadas = []
+        self.primeira_pintura = None
+        self.completa = None
+
+    def _executar(self, nome, funcao, *args):
+        # As funções em cache precisam do contexto da execução do script que as chamou
+        add_script_run_ctx(threading.current_thread(), self.contexto)
+        with self.perfil.secao(nome):
+            return funcao(*args)
+
+    def enviar(self, nome, funcao, *args):
+        """Roda `funcao(*args)` em segundo plano, como seção `nome` do perfil; retorna o Future."""
+        return self.executor.submit(self._executar, nome, funcao, *args)
+
+    def marcar_primeira_pintura(self):
+        self.primeira_pintura = time.perf_counter() - self.inicio
+        self.perfil.registrar('primeira pintura', self.primeira_pintura)
+
+    def reservar(self, nome, exibir, funcao, *args):
+        """Reserva o lugar de uma seção; em `completar`, `funcao(*args, versao)` roda em segundo plano
+        e `exibir(resultado)` preenche o lugar."""
+        lugar = st.empty()
+        lugar.info(MENSAGEM_CARREGANDO)
+        self.reservadas.append((nome, lugar, exibir, funcao, args))
+
+    def cancelar(self):
+        """Limpa os lugares reservados e descarta as tarefas (ex.: quando a carga falha)."""
+        for _, lugar, *_ in self.reservadas:
+            lugar.empty()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def completar(self, versao):
+        """Envia as seções reservadas e preenche cada uma na ordem em que ficam prontas.
+
+        A construção (`funcao`) e a exibição (st.table, st.plotly_chart...) são seções separadas do perfil.
+        """
+        tarefas = {self.enviar(nome, funcao, *args, versao): (nome, lugar, exibir)
+                   for nome, lugar, exibir, funcao, args in self.reservadas}
+        for tarefa in as_completed(tarefas):
+            nome, lugar, exibir = tarefas[tarefa]
+            resultado = tarefa.result()
+            with self.perfil.secao(f"{nome} (exibição)"), lugar.container():
+                exibir(resultado)
+        self.executor.shutdown()
+        self.completa = time.perf_counter() - self.inicio
+        self.perfil.registrar('página completa', self.completa)
@@ -1,43 +1,49 @@
+import os
+import time
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import numpy as np
-from unidecode import unidecode
-from scipy.stats import mode, chi2_contingency
-import statsmodels.api as sm
-from statsmodels.formula.api import ols
-from plotly.subplots import make_subplots
-
-@st.cache_data # Adiciona cache à função de carregar dados
-def carregar_dados():
-    return pd.read_csv("DadosCriminais.csv", low_memory=False, sep=";")  # Substitua pelo seu caminho de arquivo ou função de carga
-
-DadosCriminais = carregar_dados()
-DadosCriminais = DadosCriminais[DadosCriminais['ANO_BO'] != 2021]
-
-# Correções nos nomes dos departamentos e crimes
-correcao_dpto = {
-    'dipol - depto de inteligencia': 'Dipol ',
-    "deinter 2 - campinas": "Deiter 2 ",
-    "dope-depto op pol estrat." : "Dope ",
-    "demacro": "Demacro ",
-    "decap": "Decap "
-}
-DadosCriminais['NOME_DEPARTAMENTO'] = DadosCriminais['NOME_DEPARTAMENTO'].replace(correcao_dpto)
-
-correcao_crimes = {
-    'furto - outros': 'Furto',
-    "roubo - outros": "Roubo",
-    "lesao corporal dolosa": "Lesao corporal dolosa", 
-    "furto de veiculo": "Furto de veiculo",
-    "roubo de veiculo": "Roubo de veiculo",
-    "lesao corporal culposa por acidade de transito": "Lesao corporal culposa por acidade de transito", 
-    "lesao corporal dolosa": "Lesao corporal dolosa",
-    "trafico de entorpecentes": "Trafico de entorpecentes"
-}
-DadosCriminais['NATUREZA_APURADA'] = DadosCriminais['NATUREZA_APURADA'].replace(correcao_crimes)
 
+# scipy e statsmodels não são usados na renderização e unidecode só na limpeza dos rótulos: são importados
+# sob demanda por importacao.importar quando um recurso precisa deles
+import agregacoes
+import dados
+import figuras
+import graficos
+import importacao
+import inferencia
+import perfil
+import progressivo
+
+# Modo de perfil (DADOS_CRIMINAIS_PERFIL=1 ou ?perfil=1): tempo, memória e acerto de cache de cada seção
+perfil_app = perfil.Perfil(perfil.perfil_ativo())
+# A carga e as agregações rodam em segundo plano; o texto da página é enviado antes delas
+pagina = progressivo.Pagina(perfil_app)
+
+# DADOS_CRIMINAIS_CSV aceita um caminho ou um padrão (ex.: "exportacoes/*.csv"); com padrão, cada arquivo é
+# lido e limpo em um processo, até DADOS_CRIMINAIS_PROCESSOS processos
+caminho_dados = os.environ.get("DADOS_CRIMINAIS_CSV", dados.CAMINHO_CSV)
+processos = os.environ.get("DADOS_CRIMINAIS_PROCESSOS")
+# Com DADOS_CRIMINAIS_BLOCOS=<linhas> o CSV é lido em blocos e só o cubo de contagens fica em memória
+tamanho_bloco = os.environ.get("DADOS_CRIMINAIS_BLOCOS")
+
+# `marca` (mtime e tamanho dos arquivos) faz o cache expirar quando o CSV muda; a nova carga é incremental.
+# cache_resource guarda um único objeto por processo, compartilhado por todas as sessões sem cópia (cache_data
+# devolveria uma cópia desserializada a cada sessão e a cada execução). Os DataFrames são só de leitura: com o
+# Copy-on-Write do pandas, qualquer alteração feita por uma sessão gera uma cópia local. max_entries=1 libera a
+# versão anterior quando o CSV muda
+@perfil_app.cache_resource(max_entries=1)
+def carregar_dados(caminho=dados.CAMINHO_CSV, tamanho_bloco=None, processos=None, marca=None):
+    return dados.carregar_painel(caminho, tamanho_bloco, processos, secao=perfil_app.secao)
+
+# Tempo de cada consulta às tabelas de estatísticas: busca no cache mais a fatia da tabela pré-calculada
+tempos_cache = {}
+
+def medir_cache(nome, funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    tempos_cache[nome] = time.perf_counter() - inicio
+    return resultado
 
 # ========================================================================================================================================= #
 # Título da página
@@ -49,7 +55,13 @@ st.subheader("Introdução")
 # Texto explicativo para o primeiro gráfico
 st.write("""Neste trabalho, escolhemos explorar a base de dados de crimes cometidos na cidade de São Paulo, fornecida por órgãos de segurança pública. A base de dados contém informações detalhadas sobre boletins de ocorrência registrados na cidade
          , incluindo a natureza do crime, a data e hora da ocorrência, a localização, e outras informações relevantes.""")
+pagina.marcar_primeira_pintura()
 
+# A carga só começa depois do título e da introdução enviados, para não disputar o GIL com eles. A marca dos
+# arquivos é lida dentro da tarefa: um CSV ausente aparece como erro da carga
+carga = pagina.enviar('carga', lambda: carregar_dados(caminho_dados, tamanho_bloco, processos, dados.marca_arquivos(caminho_dados)))
+# Mensagem de erro da carga, se houver
+aviso_carga = st.empty()
 
 # ========================================================================================================================================= #
 st.write('-'*10)
@@ -59,62 +71,34 @@ st.subheader("Análises:")
 st.write("""No gráfico de pizza, observa-se que 2023 foi o ano com maior quantidade de crimes registrados, representando 44.3% das ocorrências. Já 2022 contou com 42% dos crimes
 , enquanto 2024, até agora, apresenta a menor porcentagem com 13.7% pois não está com todos os meses de referência, mas ainda sim apresenta caracteristicas muito interessantes. """)
 
-# Crimes por anos
-crimes_anos = DadosCriminais.groupby('ANO_BO').size().reset_index(name='QTD')
-crimes_anos['%'] = round((crimes_anos['QTD'] / crimes_anos['QTD'].sum()) * 100, 2)
-
-# Criar o gráfico de pizza usando Plotly
-fig1 = px.pie(
-    crimes_anos, 
-    values='QTD', 
-    names='ANO_BO', 
-    title='Quantidades de Ocorrências por Ano', 
-    labels={'QTD': 'Quantidade', 'ANO_BO': 'Ano'},
-    color_discrete_map={
-        '2022': 'rgb(28, 10, 248)',  # Azul para 2022
-        '2023': 'rgb(255, 99, 71)',  # Vermelho para 2023
-        '2024': 'rgb(60, 179, 113)'  # Verde opaco para 2024
-    }
-)
+# Crimes por anos. Cada figura pronta fica em cache por versão dos dados e valores dos seus seletores
+# (LRU de figuras.MAX_FIGURAS entradas): mexer em um seletor só reconstrói a figura que depende dele
+@perfil_app.cache_resource(max_entries=figuras.MAX_FIGURAS)
+def criar_fig1(versao):
+    return figuras.preparar(graficos.crimes_por_ano(CuboCriminal))
 
-# Exibir o gráfico no Streamlit
-st.plotly_chart(fig1)
+# Exibir o gráfico no Streamlit quando ficar pronto
+pagina.reservar('fig1', lambda preparada: figuras.exibir(preparada, 'fig1'), criar_fig1)
 
 # =============================================================================================================================================== #
 st.write("""Abaixo veremos as medidas estatisticas da nossa base filtradas pelos anos, podendo assim verificar a distribuição e o comportamento dos dados.""")
 
-# Função para criar o DataFrame com estatísticas
-@st.cache_data
-def criar_tabela_estatisticas(df_filtrado):
-    frequencias = df_filtrado['NATUREZA_APURADA'].value_counts()
-    estatisticas_descritivas = round(frequencias.describe(), 2)
-    variancia = round(frequencias.var(), 2)
-    moda = df_filtrado['NATUREZA_APURADA'].mode()
-    categoria_max = frequencias.idxmax()
-    categoria_min = frequencias.idxmin()
-
-    data = {
-        'Medidas': ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max', 'variancia', 'moda'],
-        'Valores': [
-            estatisticas_descritivas['count'], estatisticas_descritivas['mean'], estatisticas_descritivas['std'],
-            estatisticas_descritivas['min'], estatisticas_descritivas['25%'], estatisticas_descritivas['50%'],
-            estatisticas_descritivas['75%'], estatisticas_descritivas['max'], variancia, moda.iloc[0]
-        ],
-        'Categoria': ['', '', '', categoria_min, '', '', '', categoria_max, '', '']
-    }
-    return pd.DataFrame(data, index=None)
+# Medidas estatísticas de todos os anos e regiões, calculadas de uma vez; as três tabelas da página só fatiam
+@perfil_app.cache_resource(max_entries=1)
+def criar_tabelas_estatisticas(versao):
+    return agregacoes.tabelas_estatisticas(CuboCriminal)
 
-# Streamlit application
-ano_escolhido = st.selectbox('Escolha o ano:', [2022, 2023, 2024, 'Todos'])
-if ano_escolhido == 'Todos':
-    df_filtrado = DadosCriminais
-else:
-    df_filtrado = DadosCriminais[DadosCriminais['ANO_BO'] == ano_escolhido]
+def criar_tabela_medidas(nome, recorte, grupo, versao):
+    return medir_cache(nome, agregacoes.tabela_do_recorte, criar_tabelas_estatisticas(versao), recorte, grupo)
 
-tabela_medidas = criar_tabela_estatisticas(df_filtrado)
+def exibir_tabela_medidas(tabela_medidas):
+    st.subheader('Tabela de Medidas Estatísticas')
+    st.table(tabela_medidas)
 
-st.subheader('Tabela de Medidas Estatísticas')
-st.table(tabela_medidas)
+# Streamlit application
+ano_escolhido = st.selectbox('Escolha o ano:', [2022, 2023, 2024, 'Todos'])
+pagina.reservar('tabela de estatísticas por ano', exibir_tabela_medidas, criar_tabela_medidas,
+                'Estatísticas por ano', 'crimes_por_ano', ano_escolhido)
 
 
 # =============================================================================================================================================== #
@@ -129,71 +113,21 @@ st.write("""No gráfico de barras, uma análise mensal revela padrões interessa
          , sabendo que não temos informações completas do mês de fevereiro o gráfico sugere uma tendência de crescimento na criminalidade nesse período. 
          Essa tendencia será melhor apresentada nos gráficos posteriores""")
 
-# Selecionar apenas três meses específicos
-meses_selecionados = [1, 2, 3]  # Por exemplo, janeiro, fevereiro e março
-dados_selecionados = DadosCriminais[DadosCriminais['MES_ESTATISTICA'].isin(meses_selecionados)]
-
-# Agrupar os dados por ano, mês e contar as ocorrências
-agrupados = dados_selecionados.groupby(['ANO_BO', 'MES_ESTATISTICA']).size().reset_index(name='count')
-
-# Criar um texto de hover que inclui os cinco maiores crimes de cada mês
-@st.cache_data
-def criar_hover_text(ano, mes):
-    dados_mes = dados_selecionados[(dados_selecionados['ANO_BO'] == ano) & (dados_selecionados['MES_ESTATISTICA'] == mes)]
-    top_5_crimes = dados_mes['NATUREZA_APURADA'].value_counts().head(5)
-    hover_text = '<br>'.join([f"{crime}: {count}" for crime, count in top_5_crimes.items()])
-    return hover_text
-
-agrupados['hover_text'] = agrupados.apply(lambda row: criar_hover_text(row['ANO_BO'], row['MES_ESTATISTICA']), axis=1)
-
-# Definir as cores específicas para cada ano
-colors = {
-    2022: 'rgba(100, 149, 237, 0.6)',  # Azul para 2022
-    2023: 'rgba(255, 99, 71, 0.6)',  # Vermelho para 2023
-    2024: 'rgba(60, 179, 113, 0.6)'  # Verde opaco para 2024
-}
-
-# Criar o gráfico de barras usando Plotly
-fig2 = go.Figure()
-
-# Adicionar barras para cada mês e ano
-for ano in [2022, 2023, 2024]:
-    for mes in meses_selecionados:
-        dados_mes_ano = agrupados[(agrupados['MES_ESTATISTICA'] == mes) & (agrupados['ANO_BO'] == ano)]
-        if not dados_mes_ano.empty:
-            show_legend = mes == 1  # Mostrar a legenda apenas para o primeiro mês
-            fig2.add_trace(go.Bar(
-                x=[mes],
-                y=dados_mes_ano['count'],
-                name=str(ano),
-                marker_color=colors[ano],
-                hovertemplate='<b>Mês:</b> %{x}<br><b>Ano:</b> %{customdata}<br><b>Contagem:</b> %{y}<br><b>Crimes:</b><br>%{hovertext}',
-                customdata=[ano],
-                hovertext=dados_mes_ano['hover_text'],
-                showlegend=show_legend
-            ))
-
-# Ajustar o layout do gráfico
-fig2.update_layout(
-    title='Contagem de Ocorrências por Mês e Ano',
-    xaxis=dict(
-        tickmode='array',
-        tickvals=meses_selecionados,
-        ticktext=['Janeiro', 'Fevereiro', 'Março']  # Ajuste os nomes dos meses conforme necessário
-    ),
-    barmode='group',  # Garantir que as barras estejam lado a lado
-    legend_title_text='Ano',
-    legend=dict(
-        orientation='h',
-        yanchor='bottom',
-        y=1.02,
-        xanchor='right',
-        x=1
-    )
+nomes_meses = graficos.NOMES_MESES
+
+# Selecionar os meses do gráfico (por padrão janeiro, fevereiro e março)
+meses_selecionados = st.multiselect(
+    'Escolha os meses:', list(range(1, 13)), default=[1, 2, 3], format_func=lambda mes: nomes_meses[mes - 1]
 )
+meses_selecionados = sorted(meses_selecionados)
+
+# Agrupar os dados por ano e mês, com um texto de hover dos cinco maiores crimes de cada mês
+@perfil_app.cache_resource(max_entries=figuras.MAX_FIGURAS)
+def criar_fig2(meses_selecionados, versao):
+    return figuras.preparar(graficos.contagem_por_mes(CuboCriminal, meses_selecionados))
 
-# Exibir o gráfico no Streamlit
-st.plotly_chart(fig2)
+# Exibir o gráfico no Streamlit quando ficar pronto
+pagina.reservar('fig2', lambda preparada: figuras.exibir(preparada, 'fig2'), criar_fig2, meses_selecionados)
 
 # ================================================================================================================================================= # 
 
@@ -213,29 +147,13 @@ st.write("""Para 2024, embora o ano tenha começado com uma menor incidência de
          Este padrão inicial sugere uma possível escalada nas ocorrências à medida que o ano progride
          , necessitando de monitoramento contínuo para verificar se essa tendência se mantém ou se alterações nas políticas de segurança pública poderão mitigar tais elevações.""")
 
-# Selecionar as colunas 'ANO_BO' e 'MES_ESTATISTICA'
-ocorrencias_mes = DadosCriminais[['ANO_BO', 'MES_ESTATISTICA']]
-
-# Agrupar os dados por 'ANO_BO' e 'MES_ESTATISTICA' e calcular a quantidade de registros por mês
-ocorrencias_agrupadas = ocorrencias_mes.groupby(['ANO_BO', 'MES_ESTATISTICA']).size().reset_index(name='QTD')
-
-# Criar o gráfico de linhas usando Plotly
-fig3 = px.line(
-    ocorrencias_agrupadas,
-    x='MES_ESTATISTICA',
-    y='QTD',
-    color='ANO_BO',
-    title='Quantidade de Ocorrências por Mês e Ano',
-    labels={'MES_ESTATISTICA': 'Mês', 'QTD': 'Quantidade', 'ANO_BO': 'Ano'},
-    color_discrete_map={
-        '2022': 'rgba(28, 10, 248, 0.6)',  # Azul para 2022
-        '2023': 'rgba(255, 99, 71, 0.6)',  # Vermelho para 2023
-        '2024': 'rgba(60, 179, 113, 0.6)'  # Verde opaco para 2024
-    }
-)
+# Somar o cubo por 'ANO_BO' e 'MES_ESTATISTICA' para obter a quantidade de registros por mês
+@perfil_app.cache_resource(max_entries=figuras.MAX_FIGURAS)
+def criar_fig3(versao):
+    return figuras.preparar(graficos.ocorrencias_por_mes(CuboCriminal))
 
-# Exibir o gráfico no Streamlit
-st.plotly_chart(fig3)
+# Exibir o gráfico no Streamlit quando ficar pronto
+pagina.reservar('fig3', lambda preparada: figuras.exibir(preparada, 'fig3'), criar_fig3)
 
 st.write('-'*10)
 # =================================================================================================================================================================== #
@@ -251,43 +169,12 @@ st.write("""De acordo com o gráfico apresentado, observamos que, em 2022, a Zon
 ano_escolhido = st.selectbox('Escolha:', [2022, 2023, 2024, 'Todos'])
 
 
-# Função para calcular porcentagem de ocorrências
-@st.cache_data
-def calcular_porcentagem(ocorrencias):
-    total = ocorrencias['QTD'].sum()
-    ocorrencias['Porcentagem'] = (ocorrencias['QTD'] / total) * 100
-    return ocorrencias
-
-@st.cache_data
-def criar_pie_chart(ano):
-    dados = DadosCriminais[DadosCriminais['ANO_BO'] == ano]
-    ocorrencias = dados.groupby('regiao').size().reset_index(name='QTD')
-    ocorrencias = calcular_porcentagem(ocorrencias)
-    labels = ocorrencias['regiao']
-    values = ocorrencias['QTD']
-    return go.Pie(labels=labels, values=values, hole=.4, name=str(ano))
-
-# Criar subplots com até três gráficos de pizza, dependendo da seleção
-fig4 = make_subplots(rows=1, cols=3 if ano_escolhido == 'Todos' else 1, specs=[[{'type':'domain'}] * (3 if ano_escolhido == 'Todos' else 1)])
-
-if ano_escolhido == 'Todos':
-    fig4.add_trace(criar_pie_chart(2022), 1, 1)
-    fig4.add_trace(criar_pie_chart(2023), 1, 2)
-    fig4.add_trace(criar_pie_chart(2024), 1, 3)
-    annotations = [
-        dict(text='2022', x=0.11, y=0.5, font_size=20, showarrow=False),
-        dict(text='2023', x=0.5, y=0.5, font_size=20, showarrow=False),
-        dict(text='2024', x=0.89, y=0.5, font_size=20, showarrow=False)
-    ]
-else:
-    ano = int(ano_escolhido)
-    fig4.add_trace(criar_pie_chart(ano), 1, 1)
-    annotations = [dict(text=str(ano), x=0.5, y=0.5, font_size=20, showarrow=False)]
-
-fig4.update_layout(title_text="Regiões Mais Perigosas Anualmente", annotations=annotations)
-
-# Exibir o gráfico no Streamlit
-st.plotly_chart(fig4)
+@perfil_app.cache_resource(max_entries=figuras.MAX_FIGURAS)
+def criar_fig4(ano_escolhido, versao):
+    return figuras.preparar(graficos.regioes_do_ano(CuboCriminal, ano_escolhido))
+
+# Exibir o gráfico no Streamlit quando ficar pronto
+pagina.reservar('fig4', lambda preparada: figuras.exibir(preparada, 'fig4'), criar_fig4, ano_escolhido)
 
 # =================================================================================================================================================================== #
 # Texto explicativo para o quarto gráfico
@@ -302,70 +189,22 @@ st.write("""Segue-se a Zona Leste e a Zona Central
          , as Zonas Norte e Oeste apresentam incidências relativamente menores, com 12% e 11.6% das ocorrências
          , sugerindo um perfil de segurança um pouco mais estável, mas ainda assim suscetível a desafios.""")
 
-# Agrupar os dados por região e calcular a quantidade de registros por região
-ocorrencias_por_regiao = DadosCriminais.groupby('regiao').size().reset_index(name='QTD')
-
-# Calcular a porcentagem de cada região
-total_ocorrencias = ocorrencias_por_regiao['QTD'].sum()
-ocorrencias_por_regiao['Porcentagem'] = (ocorrencias_por_regiao['QTD'] / total_ocorrencias) * 100
-
-# Ordenar os dados para o gráfico de funil
-ocorrencias_por_regiao = ocorrencias_por_regiao.sort_values('QTD', ascending=False)
-
-# Criar o gráfico de funil usando Plotly
-fig5 = go.Figure(go.Funnel(
-    y=ocorrencias_por_regiao['regiao'],
-    x=ocorrencias_por_regiao['QTD'],
-    textinfo="value+percent total",
-    hoverinfo="name+percent total"
-))
-
-# Atualizar o layout do gráfico
-fig5.update_layout(
-    title_text="Regiões Mais Perigosas - Gráfico de Funil",
-    xaxis_title='Quantidade de Ocorrências',
-    yaxis_title='Região'  # Aqui foi corrigido de 'yashis_title' para 'yaxis_title'
-)
+# Quantidade e porcentagem de registros por região, ordenadas para o gráfico de funil
+@perfil_app.cache_resource(max_entries=figuras.MAX_FIGURAS)
+def criar_fig5(versao):
+    return figuras.preparar(graficos.ocorrencias_por_regiao(CuboCriminal))
 
-# Exibir o gráfico no Streamlit
-st.plotly_chart(fig5)
+# Exibir o gráfico no Streamlit quando ficar pronto
+pagina.reservar('fig5', lambda preparada: figuras.exibir(preparada, 'fig5'), criar_fig5)
 
 # =================================================================================================================================================================== #
 
 st.write("""Abaixo veremos as medidas estatisticas da nossa base filtradas pelos anos, podendo assim verificar a distribuição e o comportamento dos dados.""")
 
-# Função para criar o DataFrame com estatísticas
-@st.cache_data
-def criar_tabela_estatisticas_regioes(df_filtrado):
-    frequencias_regioes = df_filtrado['regiao'].value_counts()
-    estatisticas_descritivas_regioes = round(frequencias_regioes.describe(), 2)
-    variancia_regioes = round(frequencias_regioes.var(), 2)
-    moda = df_filtrado['regiao'].mode()
-    categoria_max_regioes = frequencias_regioes.idxmax()
-    categoria_min_regioes = frequencias_regioes.idxmin()
-
-    data_regioes = {
-        'Medidas': ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max', 'variancia', 'moda'],
-        'Valores': [
-            estatisticas_descritivas_regioes['count'], estatisticas_descritivas_regioes['mean'], estatisticas_descritivas_regioes['std'],
-            estatisticas_descritivas_regioes['min'], estatisticas_descritivas_regioes['25%'], estatisticas_descritivas_regioes['50%'],
-            estatisticas_descritivas_regioes['75%'], estatisticas_descritivas_regioes['max'], variancia_regioes, moda.iloc[0]
-        ],
-        'Categoria': ['', '', '', categoria_min_regioes, '', '', '', categoria_max_regioes, '', '']
-    }
-    return pd.DataFrame(data_regioes, index=None)
-
 # Streamlit application
 ano_regiao = st.selectbox('Escolha o ano das regiões:', [2022, 2023, 2024, 'Todos'])
-if ano_regiao == 'Todos':
-    df_filtrado = DadosCriminais
-else:
-    df_filtrado = DadosCriminais[DadosCriminais['ANO_BO'] == ano_regiao]
-
-tabela_medidas = criar_tabela_estatisticas_regioes(df_filtrado)
-
-st.subheader('Tabela de Medidas Estatísticas')
-st.table(tabela_medidas)
+pagina.reservar('tabela de estatísticas das regiões', exibir_tabela_medidas, criar_tabela_medidas,
+                'Estatísticas das regiões', 'regioes_por_ano', ano_regiao)
 
 
 
@@ -398,93 +237,74 @@ st.write("""Além desses, outros crimes como "Lesão corporal culposa por aciden
 # Interface do usuário para selecionar o ano
 ano_escolhido_crime = st.selectbox('Escolha o ano dos crimes:', [2022, 2023, 2024, 'Todos'])
 
-# Filtrar dados com base na escolha do ano
-if ano_escolhido_crime != 'Todos':
-    regioes_afetadas = DadosCriminais[(DadosCriminais['ANO_BO'] == ano_escolhido_crime)]
-else:
-    regioes_afetadas = DadosCriminais
-
-# Selecionar as colunas e calcular a quantidade de registros por região e natureza do crime
-regioes_afetadas = regioes_afetadas[['NATUREZA_APURADA', 'regiao', 'ANO_BO']]
-ocorrencias_agrupadas_regioes = regioes_afetadas.groupby(['regiao', 'NATUREZA_APURADA']).size().reset_index(name='QTD')
-
-# Ordenar os crimes por quantidade dentro de cada região e pegar os 5 mais comuns
-top_crimes_por_regiao = ocorrencias_agrupadas_regioes.sort_values(['regiao', 'QTD'], ascending=[True, False]).groupby('regiao').head(5)
-
-# Calcular a porcentagem de cada tipo de crime dentro de cada região
-total_ocorrencias_por_regiao = top_crimes_por_regiao.groupby('regiao')['QTD'].sum().reset_index()
-top_crimes_por_regiao = top_crimes_por_regiao.merge(total_ocorrencias_por_regiao, on='regiao', suffixes=('', '_total'))
-top_crimes_por_regiao['Porcentagem'] = (top_crimes_por_regiao['QTD'] / top_crimes_por_regiao['QTD_total']) * 100
-
-# Criar um gráfico de barras usando Plotly
-fig6 = go.Figure()
-
-# Adicionar as barras para cada região e natureza de crime
-for natureza in top_crimes_por_regiao['NATUREZA_APURADA'].unique():
-    dados_filtrados = top_crimes_por_regiao[top_crimes_por_regiao['NATUREZA_APURADA'] == natureza]
-    
-    fig6.add_trace(go.Bar(
-        x=dados_filtrados['regiao'],
-        y=dados_filtrados['QTD'],
-        name=f"{natureza} ({dados_filtrados['Porcentagem'].round(2).astype(str).values[0]}%)",
-        hovertemplate='<b>Região:</b> %{x}<br>' +
-                      '<b>Quantidade:</b> %{y}<br>' +
-                      '<b>Porcentagem:</b> %{customdata:.2f}%',
-        customdata=dados_filtrados['Porcentagem'].values,
-    ))
-
-# Ajustar o layout do gráfico
-fig6.update_layout(
-    title='Top Crimes por Região',
-    xaxis_title='Região',
-    yaxis_title='Quantidade',
-    barmode='group',  # Agrupar as barras por região
-    legend_title='Natureza do Crime'
-)
+# Os 5 crimes mais comuns de cada região no ano escolhido, com a porcentagem dentro de cada região
+@perfil_app.cache_resource(max_entries=figuras.MAX_FIGURAS)
+def criar_fig6(ano_escolhido_crime, versao):
+    return figuras.preparar(graficos.top_crimes_por_regiao(CuboCriminal, ano_escolhido_crime))
 
-# Exibir o gráfico no Streamlit
-st.plotly_chart(fig6)
+# Exibir o gráfico no Streamlit quando ficar pronto
+pagina.reservar('fig6', lambda preparada: figuras.exibir(preparada, 'fig6'), criar_fig6, ano_escolhido_crime)
 
 # =================================================================================================================================================================== #
 st.write("""Abaixo veremos as medidas estatisticas da nossa base filtradas pelos anos, podendo assim verificar a distribuição e o comportamento dos dados.""")
 import streamlit as st
 import pandas as pd
 
-# Função para criar o DataFrame com estatísticas
-@st.cache_data
-def criar_tabela_estatisticas_regioes(df_filtrado):
-    frequencias_regioes = df_filtrado['NATUREZA_APURADA'].value_counts()
-    estatisticas_descritivas_regioes = round(frequencias_regioes.describe(), 2)
-    variancia_regioes = round(frequencias_regioes.var(), 2)
-    moda = df_filtrado['NATUREZA_APURADA'].mode()
-    categoria_max_regioes = frequencias_regioes.idxmax()
-    categoria_min_regioes = frequencias_regioes.idxmin()
-
-    data_regioes = {
-        'Medidas': ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max', 'variancia', 'moda'],
-        'Valores': [
-            estatisticas_descritivas_regioes['count'], estatisticas_descritivas_regioes['mean'], estatisticas_descritivas_regioes['std'],
-            estatisticas_descritivas_regioes['min'], estatisticas_descritivas_regioes['25%'], estatisticas_descritivas_regioes['50%'],
-            estatisticas_descritivas_regioes['75%'], estatisticas_descritivas_regioes['max'], variancia_regioes, moda.iloc[0]
-        ],
-        'Categoria': ['', '', '', categoria_min_regioes, '', '', '', categoria_max_regioes, '', '']
-    }
-    return pd.DataFrame(data_regioes, index=None)
-
 # Streamlit application
 regiao_selecionada = st.selectbox(
     'Escolha a região das ocorrências:', ['zona_Central', 'zona_Leste', 'zona_Norte', 'zona_Oeste', 'zona_Sul', 'Todos']
     )
 
-if regiao_selecionada == 'Todos':
-    df_filtrado = DadosCriminais
-else:
-    df_filtrado = DadosCriminais[DadosCriminais['regiao'] == regiao_selecionada]
+pagina.reservar('tabela de estatísticas dos crimes por região', exibir_tabela_medidas, criar_tabela_medidas,
+                'Estatísticas dos crimes por região', 'crimes_por_regiao', regiao_selecionada)
 
-tabela_medidas = criar_tabela_estatisticas_regioes(df_filtrado)
+# =================================================================================================================================================================== #
+st.write('-'*10)
 
-st.subheader('Tabela de Medidas Estatísticas')
-st.table(tabela_medidas)
+st.subheader('Testes Estatísticos')
+
+st.write("""O teste qui-quadrado verifica se a distribuição dos tipos de crime depende da região; o V de Cramér mede a força
+         dessa associação, de 0 (nenhuma) a 1. A ANOVA verifica se a média de ocorrências mensais muda de um ano para outro.
+         Os testes usam as contagens já agregadas; os intervalos de confiança de 95% das médias anuais vêm de reamostragem (bootstrap).
+         Cada teste só é calculado quando ligado na sua aba.""")
+
+aba_qui_quadrado, aba_anova = st.tabs(['Região x natureza (qui-quadrado)', 'Efeito do ano (ANOVA)'])
+
+# Resultados em cache por filtro, número de repetições e versão dos dados; o bootstrap usa até DADOS_CRIMINAIS_PROCESSOS processos
+@perfil_app.cache_data
+def criar_qui_quadrado(ano, versao):
+    return inferencia.analise_qui_quadrado(CuboCriminal, ano)
+
+@perfil_app.cache_data
+def criar_anova(regiao, repeticoes, versao):
+    return inferencia.analise_anova(CuboCriminal, regiao, repeticoes, int(processos) if processos else None)
+
+def exibir_qui_quadrado(analise):
+    tabela, resultado = analise
+    st.table(pd.DataFrame({'Medidas': list(resultado), 'Valores': list(resultado.values())}))
+    st.write('Tabela de contingência')
+    st.dataframe(tabela)
+
+def exibir_anova(analise):
+    tabela_anova, medias = analise
+    st.table(tabela_anova)
+    st.write('Média mensal de ocorrências por ano')
+    st.table(medias)
+
+# st.tabs monta as duas abas em toda execução: os testes (e a importação do scipy e do statsmodels) só rodam
+# quando o analista liga o teste na aba
+with aba_qui_quadrado:
+    ano_teste = st.selectbox('Ano do teste:', [2022, 2023, 2024, 'Todos'])
+    if st.toggle('Calcular o qui-quadrado'):
+        pagina.reservar('qui-quadrado', exibir_qui_quadrado, criar_qui_quadrado, ano_teste)
+
+with aba_anova:
+    regiao_teste = st.selectbox(
+        'Região do teste:', ['Todos', 'zona_Central', 'zona_Leste', 'zona_Norte', 'zona_Oeste', 'zona_Sul']
+        )
+    repeticoes_bootstrap = st.select_slider('Repetições do bootstrap:', [0, 200, 1000, 5000], value=inferencia.REPETICOES)
+    if st.toggle('Calcular a ANOVA'):
+        pagina.reservar('anova', exibir_anova, criar_anova, regiao_teste, repeticoes_bootstrap)
 
 # ================================================================================================================================= #
 st.write('-'*10)
@@ -524,4 +344,65 @@ st.subheader('Referências')
 st.write("""SSPSP, SP Transparência Números sem Mistérios Consulta, SSPSP 2024. Disponível em: https://www.ssp.sp.gov.br/estatistica/consultas""")
 st.write("""IBGE, População, IBGE 2022. Disponível em: https://cidades.ibge.gov.br/brasil/sp/panorama""")
 
-
+# ============================================================================================================================================================================================================ #
+# Carga e seções em segundo plano: todo o texto acima já foi enviado, cada seção é preenchida quando fica pronta
+try:
+    CuboCriminal, relatorio_carga = carga.result()
+except (ValueError, FileNotFoundError) as erro:
+    # Coluna usada pelo painel ausente ou nenhum arquivo encontrado: interrompe antes de montar os gráficos
+    pagina.cancelar()
+    aviso_carga.error(str(erro))
+    st.stop()
+
+# Relatório da carga: tempo e tamanho do CSV e do snapshot
+with st.sidebar.expander("Desempenho da carga"):
+    st.write(f"CSV: {relatorio_carga['csv_bytes'] / 1e6:.1f} MB")
+    if relatorio_carga['tempo_csv'] is not None:
+        st.write(f"Leitura do CSV: {relatorio_carga['tempo_csv']:.2f} s")
+    if relatorio_carga['snapshot_bytes'] is not None:
+        st.write(f"Snapshot Parquet: {relatorio_carga['snapshot_bytes'] / 1e6:.1f} MB")
+    if relatorio_carga['tempo_snapshot'] is not None:
+        st.write(f"Leitura do snapshot: {relatorio_carga['tempo_snapshot']:.2f} s")
+    if relatorio_carga.get('tempo_cubo') is not None:
+        st.write(f"Leitura só do cubo de contagens: {relatorio_carga['tempo_cubo']:.3f} s")
+    if relatorio_carga['reconstruido']:
+        st.write("Snapshot reconstruído nesta carga.")
+    if relatorio_carga.get('anexadas') is not None:
+        st.write(f"Linhas anexadas: {relatorio_carga['anexadas']:,} em {relatorio_carga['tempo_anexar']:.2f} s")
+    if relatorio_carga.get('arquivos'):
+        st.write(f"{relatorio_carga['arquivos']} arquivos em {relatorio_carga['tempo_total']:.2f} s")
+    if relatorio_carga.get('linhas_por_segundo'):
+        st.write(f"Ingestão em blocos: {relatorio_carga['linhas']:,} linhas, {relatorio_carga['linhas_por_segundo']:,.0f} linhas/s")
+
+# Versão dos dados: as figuras e tabelas em cache são chaveadas por ela e pelos filtros, nunca pelo DataFrame
+versao_dados = relatorio_carga['versao']
+pagina.completar(versao_dados)
+
+# Tempo até a primeira pintura (título e introdução enviados) e até a página completa
+with st.sidebar.expander("Tempo da página"):
+    st.write(f"Primeira pintura: {pagina.primeira_pintura:.2f} s")
+    st.write(f"Página completa: {pagina.completa:.2f} s")
+
+# Tamanho do JSON de cada figura enviado ao navegador, antes e depois da redução
+with st.sidebar.expander("Tamanho das figuras"):
+    for nome, (original, enviado) in figuras.tamanhos_figuras.items():
+        st.write(f"{nome}: {enviado / 1e3:.1f} kB" + (f" (de {original / 1e3:.1f} kB)" if enviado != original else ""))
+
+# Custo das consultas ao cache nesta execução
+with st.sidebar.expander("Consultas ao cache"):
+    for nome, tempo in tempos_cache.items():
+        st.write(f"{nome}: {tempo * 1000:.2f} ms")
+
+@perfil_app.cache_data
+def relatorio_importacao():
+    modulos = ['streamlit', 'pandas', 'plotly.express', 'plotly.graph_objects', 'pyarrow.parquet'] + importacao.MODULOS_PESADOS
+    return pd.DataFrame(importacao.medir_importacao(modulos, limite=25))
+
+# Tempo das importações tardias já feitas e, sob demanda, o relatório de python -X importtime
+with st.sidebar.expander("Tempo de importação"):
+    for nome, tempo in importacao.tempos_importacao.items():
+        st.write(f"{nome}: {tempo * 1000:.0f} ms")
+    if st.button("Medir importações (python -X importtime)"):
+        st.dataframe(relatorio_importacao())
+
+perfil_app.mostrar()